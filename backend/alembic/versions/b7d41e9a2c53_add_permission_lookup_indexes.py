@@ -0,0 +1,58 @@
+"""Add indexes backing permission lookups
+
+Revision ID: b7d41e9a2c53
+Revises: 6fe6367fae8e
+Create Date: 2026-03-10 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from typing import Any
+
+
+def _index_exists(inspector: Any, table_name: str, index_name: str) -> bool:
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41e9a2c53'
+down_revision = '6fe6367fae8e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if not _index_exists(inspector, 'roles', 'ix_roles_tenant_name'):
+        op.create_index('ix_roles_tenant_name', 'roles', ['tenant_id', 'name'])
+    if not _index_exists(inspector, 'user_tenants', 'ix_user_tenants_user_tenant'):
+        op.create_index('ix_user_tenants_user_tenant', 'user_tenants', ['user_id', 'tenant_id'])
+    if not _index_exists(inspector, 'plan_menu_items', 'ix_plan_menu_items_plan_included'):
+        op.create_index('ix_plan_menu_items_plan_included', 'plan_menu_items', ['plan_id', 'is_included'])
+
+    # roles is a json column; index its jsonb form so role membership checks
+    # (CAST(roles AS JSONB) @> ...) can use GIN. Built concurrently to avoid
+    # locking user_tenants on large installations.
+    if not _index_exists(inspector, 'user_tenants', 'ix_user_tenants_roles_gin'):
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_user_tenants_roles_gin "
+                "ON user_tenants USING GIN ((roles::jsonb))"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if _index_exists(inspector, 'user_tenants', 'ix_user_tenants_roles_gin'):
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_user_tenants_roles_gin")
+    if _index_exists(inspector, 'plan_menu_items', 'ix_plan_menu_items_plan_included'):
+        op.drop_index('ix_plan_menu_items_plan_included', 'plan_menu_items')
+    if _index_exists(inspector, 'user_tenants', 'ix_user_tenants_user_tenant'):
+        op.drop_index('ix_user_tenants_user_tenant', 'user_tenants')
+    if _index_exists(inspector, 'roles', 'ix_roles_tenant_name'):
+        op.drop_index('ix_roles_tenant_name', 'roles')
@@ -0,0 +1,43 @@
+"""Index menu items by permission key
+
+Revision ID: c2f8a6d1e4b7
+Revises: b7d41e9a2c53
+Create Date: 2026-03-11 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from typing import Any
+
+
+def _index_exists(inspector: Any, table_name: str, index_name: str) -> bool:
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2f8a6d1e4b7'
+down_revision = 'b7d41e9a2c53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # Role listings resolve menu items with permission_key IN (...)
+    if not _index_exists(inspector, 'menu_items', 'ix_menu_items_permission_key'):
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_menu_items_permission_key "
+                "ON menu_items (permission_key)"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if _index_exists(inspector, 'menu_items', 'ix_menu_items_permission_key'):
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_menu_items_permission_key")
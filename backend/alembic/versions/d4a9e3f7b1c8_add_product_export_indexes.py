@@ -0,0 +1,54 @@
+"""Index products for the inventory export
+
+Revision ID: d4a9e3f7b1c8
+Revises: c2f8a6d1e4b7
+Create Date: 2026-03-12 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from typing import Any
+
+
+def _index_exists(inspector: Any, table_name: str, index_name: str) -> bool:
+    return any(index["name"] == index_name for index in inspector.get_indexes(table_name))
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a9e3f7b1c8'
+down_revision = 'c2f8a6d1e4b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    # The export streams active products ORDER BY name; reading them in index
+    # order avoids sorting the whole table before the first row is sent
+    if not _index_exists(inspector, 'products', 'ix_products_active_name'):
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_active_name "
+                "ON products (name) WHERE is_active"
+            )
+    # Category-filtered exports (and the category FK itself)
+    if not _index_exists(inspector, 'products', 'ix_products_category'):
+        with op.get_context().autocommit_block():
+            op.execute(
+                "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_products_category "
+                "ON products (category)"
+            )
+
+
+def downgrade() -> None:
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if _index_exists(inspector, 'products', 'ix_products_category'):
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_category")
+    if _index_exists(inspector, 'products', 'ix_products_active_name'):
+        with op.get_context().autocommit_block():
+            op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_products_active_name")
@@ -19,14 +19,48 @@ class Settings(BaseModel):
         if os.getenv("CORS_ORIGINS")
         else ["http://localhost:3000"]
     )
+    # Database connection pool
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "20"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "3600"))  # seconds
+    # Set when an external pooler (e.g. PgBouncer) already pools connections
+    DB_DISABLE_POOL: bool = os.getenv("DB_DISABLE_POOL", "false").lower() == "true"
+
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-super-secret-key-change-in-production-please")
     
     # Redis Configuration
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
     
+    # Users allowed to run platform-wide operations (shared across all tenants)
+    PLATFORM_ADMIN_EMAILS: list[str] = [
+        email.strip().lower()
+        for email in os.getenv("PLATFORM_ADMIN_EMAILS", "").split(",")
+        if email.strip()
+    ]
+    
     # Feature Flags
     REQUIRE_TENANT_DOMAIN: bool = os.getenv("REQUIRE_TENANT_DOMAIN", "false").lower() == "true"
     
+    # PDF rendering: worker processes for WeasyPrint; 0 renders in the request thread
+    PDF_RENDER_WORKERS: int = int(os.getenv("PDF_RENDER_WORKERS", str(os.cpu_count() or 1)))
+    # Hosts (and their subdomains) whose assets templates may reference but PDFs never need
+    PDF_BLOCKED_URL_HOSTS: list[str] = [
+        host.strip().lower()
+        for host in os.getenv(
+            "PDF_BLOCKED_URL_HOSTS",
+            "google-analytics.com,googletagmanager.com,doubleclick.net,connect.facebook.net",
+        ).split(",")
+        if host.strip()
+    ]
+    # Directory shared by workers for rendered PDFs, by content key; empty disables
+    PDF_CACHE_DIR: str = os.getenv("PDF_CACHE_DIR", "")
+    # Oldest cached PDFs are removed once PDF_CACHE_DIR holds more than this
+    PDF_CACHE_DIR_MAX_BYTES: int = int(os.getenv("PDF_CACHE_DIR_MAX_BYTES", str(512 * 1024 * 1024)))
+    PDF_ASSET_CACHE_MAX_BYTES: int = int(os.getenv("PDF_ASSET_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+    # Remote images, fonts and stylesheets are refetched once cached this long
+    PDF_ASSET_CACHE_TTL_SECONDS: int = int(os.getenv("PDF_ASSET_CACHE_TTL_SECONDS", "300"))
+    
     # Rate Limiting
     LOGIN_RATE_LIMIT: int = int(os.getenv("LOGIN_RATE_LIMIT", "5"))  # attempts per minute
     LOGIN_RATE_WINDOW: int = int(os.getenv("LOGIN_RATE_WINDOW", "60"))  # seconds
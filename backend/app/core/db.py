@@ -3,6 +3,9 @@ from typing import Generator
 
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
 
 
 engine = None
@@ -16,7 +19,20 @@ class Base(DeclarativeBase):
 def init_engine_and_session(database_url: str) -> None:
     global engine, SessionLocal
     if engine is None:
-        engine = create_engine(database_url, future=True)
+        if settings.DB_DISABLE_POOL:
+            # An external pooler (PgBouncer) owns the connections
+            engine = create_engine(database_url, poolclass=NullPool, future=True)
+        else:
+            engine = create_engine(
+                database_url,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+                # Drop stale connections before handing them to a request
+                pool_pre_ping=True,
+                future=True,
+            )
         # Avoid expiring ORM instances on commit so returned entities
         # can be safely accessed after the session context closes.
         SessionLocal = sessionmaker(
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Set, Optional
+from functools import cached_property, lru_cache
+from typing import Dict, List, Set, Optional, Tuple
 from uuid import UUID
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
+from app.core.config import settings
 from app.core.db import session_scope
 from app.modules.auth.repository import (
     UserTenantRepository,
@@ -24,6 +26,20 @@ class SecurityPrincipal:
     roles: List[str]
     permissions: Set[str]
 
+    @cached_property
+    def default_permission_map(self) -> Dict[str, Dict[str, bool]]:
+        """View-only permission map derived from the token's permission keys."""
+        return {
+            perm: {
+                "can_view": True,
+                "can_create": False,
+                "can_edit": False,
+                "can_delete": False,
+                "can_export": False,
+            }
+            for perm in self.permissions
+        }
+
 
 security_scheme = HTTPBearer(auto_error=False)
 
@@ -90,6 +106,13 @@ def get_current_principal(
 def require_permissions(required: List[str]):
     """Dependency factory to enforce required permissions. Returns the principal on success."""
 
+    # Identical permission lists share one dependency callable so FastAPI's
+    # per-callable introspection is reused across routes
+    return _require_permissions(tuple(sorted(set(required))))
+
+
+@lru_cache(maxsize=256)
+def _require_permissions(required: Tuple[str, ...]):
     def _dep(principal: SecurityPrincipal = Depends(get_current_principal)) -> SecurityPrincipal:
         # If no specific permission is required, just ensure authenticated
         if not required:
@@ -110,6 +133,11 @@ def require_permissions(required: List[str]):
 def require_any_permission(options: List[str]):
     """Dependency factory that allows access when user has at least one permission in options."""
 
+    return _require_any_permission(tuple(sorted(set(options))))
+
+
+@lru_cache(maxsize=256)
+def _require_any_permission(options: Tuple[str, ...]):
     def _dep(principal: SecurityPrincipal = Depends(get_current_principal)) -> SecurityPrincipal:
         if not options:
             return principal
@@ -123,3 +151,18 @@ def require_any_permission(options: List[str]):
         return principal
 
     return _dep
+
+
+def require_platform_admin(
+    principal: SecurityPrincipal = Depends(get_current_principal),
+) -> SecurityPrincipal:
+    """Allow only users listed in PLATFORM_ADMIN_EMAILS.
+
+    Tenant roles cannot grant this, since it guards state shared by every tenant.
+    """
+    if principal.email.lower() not in settings.PLATFORM_ADMIN_EMAILS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Platform administrator access required",
+        )
+    return principal
@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import DEFAULT_EXCLUDED_CONTENT_TYPES, GZipMiddleware
 
 from app.core.config import settings
 from app.core.db import init_engine_and_session
@@ -19,6 +20,17 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Compress responses for clients that accept gzip. Excel files are
+    # already zip archives, so compressing them again only costs CPU.
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=1024,
+        compresslevel=6,
+        exclude_content_types=DEFAULT_EXCLUDED_CONTENT_TYPES + (
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        ),
+    )
+
     # DB setup
     init_engine_and_session(settings.database_url)
 
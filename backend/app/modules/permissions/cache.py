@@ -0,0 +1,137 @@
+import hashlib
+import json
+import threading
+from typing import Dict, List, Optional
+from uuid import UUID
+
+import redis
+from cachetools import TTLCache
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+USER_PERMISSIONS_TTL_SECONDS = 60
+LOCAL_CACHE_MAXSIZE = 10_000
+CATALOG_EPOCH_KEY = "catalog_epoch"
+
+
+class PermissionCache:
+    """Redis-backed cache of effective user permissions
+
+    Without Redis the same keys live in a per-process TTL cache, so
+    invalidation only reaches the current worker.
+    """
+
+    def __init__(self):
+        try:
+            self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+            # Test connection
+            self.redis_client.ping()
+        except (redis.ConnectionError, redis.RedisError):
+            # Fallback to None if Redis is not available
+            self.redis_client = None
+
+        self._local: TTLCache = TTLCache(maxsize=LOCAL_CACHE_MAXSIZE, ttl=USER_PERMISSIONS_TTL_SECONDS)
+        self._local_epochs: Dict[UUID, int] = {}
+        self._local_lock = threading.Lock()
+        self._local_catalog_epoch = 0
+
+    @staticmethod
+    def _epoch_key(tenant_id: UUID) -> str:
+        return f"perm_epoch:{tenant_id}"
+
+    def _user_key(self, user_id: UUID, tenant_id: UUID, roles: List[str]) -> str:
+        # The tenant epoch is bumped whenever a role changes, and the role-set
+        # hash changes when the user's memberships do, so stale entries are
+        # never read back and simply expire.
+        if self.redis_client:
+            epoch = self.redis_client.get(self._epoch_key(tenant_id)) or "0"
+        else:
+            epoch = self._local_epochs.get(tenant_id, 0)
+        role_version = hashlib.sha1(",".join(sorted(roles)).encode()).hexdigest()[:8]
+        return f"perms:{tenant_id}:{user_id}:{epoch}:{role_version}"
+
+    def get_user_permissions(
+        self, user_id: UUID, tenant_id: UUID, roles: List[str]
+    ) -> Optional[Dict[str, Dict[str, bool]]]:
+        """Return cached permissions, or None on a miss"""
+        if not self.redis_client:
+            with self._local_lock:
+                return self._local.get(self._user_key(user_id, tenant_id, roles))
+
+        try:
+            cached = self.redis_client.get(self._user_key(user_id, tenant_id, roles))
+        except (redis.ConnectionError, redis.RedisError):
+            return None
+
+        return json.loads(cached) if cached is not None else None
+
+    def set_user_permissions(
+        self,
+        user_id: UUID,
+        tenant_id: UUID,
+        roles: List[str],
+        permissions: Dict[str, Dict[str, bool]],
+    ) -> None:
+        if not self.redis_client:
+            with self._local_lock:
+                self._local[self._user_key(user_id, tenant_id, roles)] = permissions
+            return
+
+        try:
+            self.redis_client.setex(
+                self._user_key(user_id, tenant_id, roles),
+                USER_PERMISSIONS_TTL_SECONDS,
+                json.dumps(permissions),
+            )
+        except (redis.ConnectionError, redis.RedisError):
+            pass
+
+    def catalog_epoch(self) -> str:
+        """Version of the shared catalog, bumped by bump_catalog_epoch"""
+        if not self.redis_client:
+            return str(self._local_catalog_epoch)
+
+        try:
+            redis_epoch = self.redis_client.get(CATALOG_EPOCH_KEY) or "0"
+        except (redis.ConnectionError, redis.RedisError):
+            redis_epoch = "?"
+        # The local part still moves when Redis is unreachable during a bump
+        return f"{redis_epoch}:{self._local_catalog_epoch}"
+
+    def bump_catalog_epoch(self) -> None:
+        """Make every worker drop its cached catalog"""
+        with self._local_lock:
+            self._local_catalog_epoch += 1
+        if not self.redis_client:
+            return
+
+        try:
+            self.redis_client.incr(CATALOG_EPOCH_KEY)
+        except (redis.ConnectionError, redis.RedisError):
+            pass
+
+    def invalidate_tenant(self, tenant_id: UUID) -> None:
+        """Invalidate every cached permission set for a tenant"""
+        if not self.redis_client:
+            with self._local_lock:
+                self._local_epochs[tenant_id] = self._local_epochs.get(tenant_id, 0) + 1
+            return
+
+        try:
+            self.redis_client.incr(self._epoch_key(tenant_id))
+        except (redis.ConnectionError, redis.RedisError):
+            pass
+
+
+_permission_cache: Optional[PermissionCache] = None
+
+
+def get_permission_cache() -> PermissionCache:
+    """Return the process-wide permission cache, connecting on first use"""
+    global _permission_cache
+    if _permission_cache is None:
+        _permission_cache = PermissionCache()
+    return _permission_cache
@@ -13,13 +13,18 @@ from app.modules.permissions.schemas import (
     MenuItemWithModule,
     NavigationResponse,
 )
-from app.modules.permissions.service import PermissionService
+from app.modules.permissions.service import (
+    CATALOG_EPOCH_CHECK_SECONDS,
+    PermissionService,
+    clear_catalog_cache,
+)
 from app.core.db import session_scope
 from app.core.security import (
     SecurityPrincipal,
     get_current_principal,
     require_permissions,
     require_any_permission,
+    require_platform_admin,
 )
 
 
@@ -37,7 +42,7 @@ def get_permission_service(db: Session = Depends(get_db)) -> PermissionService:
     return PermissionService(db)
 
 @router.get("/available-menus", response_model=AvailableMenusResponse)
-async def get_available_menus(
+def get_available_menus(
     principal: SecurityPrincipal = Depends(get_current_principal),
     permission_service: PermissionService = Depends(get_permission_service)
 ):
@@ -46,7 +51,7 @@ async def get_available_menus(
 
 
 @router.get("/modules", response_model=List[ModuleSchema])
-async def get_modules(
+def get_modules(
     principal: SecurityPrincipal = Depends(get_current_principal),
     permission_service: PermissionService = Depends(get_permission_service)
 ):
@@ -55,7 +60,7 @@ async def get_modules(
 
 
 @router.get("/menu-items", response_model=List[MenuItemWithModule])
-async def get_menu_items(
+def get_menu_items(
     principal: SecurityPrincipal = Depends(get_current_principal),
     permission_service: PermissionService = Depends(get_permission_service)
 ):
@@ -64,7 +69,7 @@ async def get_menu_items(
 
 
 @router.get("/roles", response_model=List[RoleWithPermissions])
-async def get_roles(
+def get_roles(
     principal: SecurityPrincipal = Depends(require_permissions(["roles.view"])),
     permission_service: PermissionService = Depends(get_permission_service)
 ):
@@ -73,7 +78,7 @@ async def get_roles(
 
 
 @router.get("/roles/{role_id}", response_model=RoleWithPermissions)
-async def get_role(
+def get_role(
     role_id: UUID,
     principal: SecurityPrincipal = Depends(require_permissions(["roles.view"])),
     permission_service: PermissionService = Depends(get_permission_service)
@@ -89,7 +94,7 @@ async def get_role(
 
 
 @router.post("/roles", response_model=RoleWithPermissions)
-async def create_role(
+def create_role(
     role_data: RoleCreate,
     principal: SecurityPrincipal = Depends(require_permissions(["roles.create"])),
     permission_service: PermissionService = Depends(get_permission_service)
@@ -103,7 +108,7 @@ async def create_role(
 
 
 @router.put("/roles/{role_id}", response_model=RoleWithPermissions)
-async def update_role(
+def update_role(
     role_id: UUID,
     role_data: RoleUpdate,
     principal: SecurityPrincipal = Depends(require_any_permission(["roles.update", "roles.edit"])),
@@ -119,7 +124,7 @@ async def update_role(
 
 
 @router.delete("/roles/{role_id}")
-async def delete_role(
+def delete_role(
     role_id: UUID,
     principal: SecurityPrincipal = Depends(require_permissions(["roles.delete"])),
     permission_service: PermissionService = Depends(get_permission_service)
@@ -134,7 +139,7 @@ async def delete_role(
 
 
 @router.get("/subscription-plans", response_model=List[SubscriptionPlanSchema])
-async def get_subscription_plans(
+def get_subscription_plans(
     principal: SecurityPrincipal = Depends(get_current_principal),
     permission_service: PermissionService = Depends(get_permission_service)
 ):
@@ -142,8 +147,25 @@ async def get_subscription_plans(
     return permission_service.get_subscription_plans()
 
 
+@router.post("/admin/reload")
+def reload_catalog(
+    principal: SecurityPrincipal = Depends(require_platform_admin),
+):
+    """Clear cached modules, menu items and subscription plans.
+
+    The catalog is shared by every tenant, so only platform administrators
+    may reload it. This worker reloads at once; the others within
+    CATALOG_EPOCH_CHECK_SECONDS.
+    """
+    clear_catalog_cache()
+    return {
+        "message": "Permission catalog reloaded",
+        "propagation_seconds": CATALOG_EPOCH_CHECK_SECONDS,
+    }
+
+
 @router.get("/user-permissions")
-async def get_user_permissions(
+def get_user_permissions(
     principal: SecurityPrincipal = Depends(get_current_principal),
     permission_service: PermissionService = Depends(get_permission_service)
 ):
@@ -152,22 +174,11 @@ async def get_user_permissions(
         principal.user_id, 
         principal.tenant_id
     )
-    if not permissions:
-        permissions = {
-            perm: {
-                "can_view": True,
-                "can_create": False,
-                "can_edit": False,
-                "can_delete": False,
-                "can_export": False,
-            }
-            for perm in principal.permissions
-        }
-    return {"permissions": permissions}
+    return {"permissions": permissions or principal.default_permission_map}
 
 
 @router.get("/navigation", response_model=NavigationResponse)
-async def get_navigation(
+def get_navigation(
     principal: SecurityPrincipal = Depends(get_current_principal),
     permission_service: PermissionService = Depends(get_permission_service),
 ):
@@ -175,4 +186,5 @@ async def get_navigation(
         principal.tenant_id,
         set(principal.permissions),
     )
-    return NavigationResponse(modules=navigation_modules)
+    # Modules are built from trusted catalog rows with model_construct
+    return NavigationResponse.model_construct(modules=navigation_modules)
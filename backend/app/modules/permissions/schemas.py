@@ -134,6 +134,9 @@ class NavigationMenuItem(BaseModel):
     permission_key: str
     sort_order: int = 0
 
+    class Config:
+        frozen = True
+
 
 class NavigationModule(BaseModel):
     id: UUID
@@ -143,6 +146,9 @@ class NavigationModule(BaseModel):
     sort_order: int = 0
     items: List[NavigationMenuItem] = []
 
+    class Config:
+        frozen = True
+
 
 class NavigationResponse(BaseModel):
     modules: List[NavigationModule]
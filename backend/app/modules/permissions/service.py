@@ -1,7 +1,12 @@
-from typing import List, Dict, Optional, Any
+import threading
+from functools import lru_cache
+from typing import List, Dict, Optional, Any, Tuple
 from uuid import UUID, uuid4
-from sqlalchemy.orm import Session, selectinload
-from sqlalchemy import and_
+from cachetools import Cache, TTLCache, cached
+from cachetools.keys import hashkey
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+from sqlalchemy import and_, cast, select
+from sqlalchemy.dialects.postgresql import JSONB
 from fastapi import HTTPException, status
 
 from app.modules.permissions.models import (
@@ -9,13 +14,16 @@ from app.modules.permissions.models import (
     SubscriptionPlan, PlanMenuItem
 )
 from app.modules.auth.models import Role, Tenant, UserTenant
+from app.modules.permissions.cache import get_permission_cache
 from app.modules.permissions.schemas import (
     RoleCreate,
     RoleUpdate,
     RoleWithPermissions,
     AvailableMenusResponse,
     ModuleSchema,
+    MenuItemSchema,
     MenuItemWithModule,
+    RolePermissionWithMenuItem,
     RoleSchema,
     SubscriptionPlanSchema,
     NavigationModule,
@@ -23,16 +31,136 @@ from app.modules.permissions.schemas import (
 )
 
 
+# Tenant-independent catalog data (modules, menu items, plans) is cached per
+# worker process. Modules and menu items expire so seed changes show up
+# without a restart; plans only change on deploy and are kept until reload.
+# Entries are keyed by the shared catalog epoch, so a reload in any worker
+# reaches the others within CATALOG_EPOCH_CHECK_SECONDS.
+CATALOG_CACHE_TTL_SECONDS = 300
+CATALOG_EPOCH_CHECK_SECONDS = 5
+
+_catalog_cache: TTLCache = TTLCache(maxsize=2, ttl=CATALOG_CACHE_TTL_SECONDS)
+_plan_cache: Cache = Cache(maxsize=1)
+_plan_menus_cache: TTLCache = TTLCache(maxsize=64, ttl=CATALOG_CACHE_TTL_SECONDS)
+_catalog_lock = threading.Lock()
+_catalog_epoch_cache: TTLCache = TTLCache(maxsize=1, ttl=CATALOG_EPOCH_CHECK_SECONDS)
+_catalog_epoch_lock = threading.Lock()
+
+
+def _catalog_epoch() -> str:
+    # Read the shared epoch at most once per check interval
+    with _catalog_epoch_lock:
+        epoch = _catalog_epoch_cache.get("epoch")
+        if epoch is None:
+            epoch = _catalog_epoch_cache["epoch"] = get_permission_cache().catalog_epoch()
+        return epoch
+
+
+def clear_catalog_cache() -> None:
+    """Drop cached modules, menu items and subscription plans in every worker"""
+    get_permission_cache().bump_catalog_epoch()
+    with _catalog_epoch_lock:
+        _catalog_epoch_cache.clear()
+    with _catalog_lock:
+        _catalog_cache.clear()
+        _plan_cache.clear()
+        _plan_menus_cache.clear()
+
+
+def _module_schema(module: Module) -> ModuleSchema:
+    # Rows come straight from the database, so skip re-validating them
+    return ModuleSchema.model_construct(
+        id=module.id,
+        code=module.code,
+        name=module.name,
+        description=module.description,
+        icon=module.icon,
+        sort_order=module.sort_order,
+        is_active=module.is_active,
+        created_at=module.created_at,
+    )
+
+
+def _plain_menu_item_schema(item: MenuItem) -> MenuItemSchema:
+    return MenuItemSchema.model_construct(
+        id=item.id,
+        module_id=item.module_id,
+        code=item.code,
+        name=item.name,
+        description=item.description,
+        route=item.route,
+        permission_key=item.permission_key,
+        icon=item.icon,
+        sort_order=item.sort_order,
+        is_active=item.is_active,
+        created_at=item.created_at,
+    )
+
+
+def _menu_item_schema(item: MenuItem, module: ModuleSchema) -> MenuItemWithModule:
+    return MenuItemWithModule.model_construct(
+        id=item.id,
+        module_id=item.module_id,
+        code=item.code,
+        name=item.name,
+        description=item.description,
+        route=item.route,
+        permission_key=item.permission_key,
+        icon=item.icon,
+        sort_order=item.sort_order,
+        is_active=item.is_active,
+        created_at=item.created_at,
+        module=module,
+    )
+
+
+# Permission flags are aggregated as bitmasks and only expanded to the
+# public {"can_view": ...} shape when building responses
+PERM_VIEW, PERM_CREATE, PERM_EDIT, PERM_DELETE, PERM_EXPORT = 1, 2, 4, 8, 16
+
+# Trailing token action -> bits it grants (every action implies view)
+_ACTION_BITS: Dict[str, int] = {
+    "view": PERM_VIEW,
+    "create": PERM_CREATE | PERM_VIEW,
+    "edit": PERM_EDIT | PERM_VIEW,
+    "update": PERM_EDIT | PERM_VIEW,
+    "delete": PERM_DELETE | PERM_VIEW,
+    "export": PERM_EXPORT | PERM_VIEW,
+}
+_FLAG_BITS: Tuple[Tuple[str, int], ...] = (
+    ("can_view", PERM_VIEW),
+    ("can_create", PERM_CREATE),
+    ("can_edit", PERM_EDIT),
+    ("can_delete", PERM_DELETE),
+    ("can_export", PERM_EXPORT),
+)
+
+
+def _permission_flags(bits: int) -> Dict[str, bool]:
+    return {flag: bool(bits & bit) for flag, bit in _FLAG_BITS}
+
+
+# Number of roles loaded per round trip when listing a tenant's roles
+ROLE_BATCH_SIZE = 100
+
+
 class PermissionService:
     def __init__(self, db: Session):
         self.db = db
+        # Per-request memo; the service lives for a single request session
+        self._plan_by_tenant: Dict[UUID, SubscriptionPlan] = {}
+        self._menus_by_tenant: Dict[UUID, AvailableMenusResponse] = {}
+
+    def _resolve_subscription_plan(self, tenant_id: UUID) -> SubscriptionPlan:
+        """Resolve the subscription plan that governs a tenant's menus"""
+
+        if tenant_id in self._plan_by_tenant:
+            return self._plan_by_tenant[tenant_id]
 
-    def get_available_menus_for_tenant(self, tenant_id: UUID) -> AvailableMenusResponse:
-        """Get available menus based on tenant's subscription plan"""
-        
         # Get tenant with subscription plan
+        # Many-to-one, so join it into the tenant query instead of a second SELECT
         tenant = self.db.query(Tenant).options(
-            selectinload(Tenant.subscription_plan)
+            joinedload(Tenant.subscription_plan)
         ).filter(Tenant.id == tenant_id).first()
         
         if not tenant:
@@ -61,178 +189,252 @@ class PermissionService:
                 self.db.flush()
         else:
             subscription_plan = tenant.subscription_plan
-        
-        # Get menu items available for this plan
-        available_menu_items = self.db.query(MenuItem).join(
-            PlanMenuItem, MenuItem.id == PlanMenuItem.menu_item_id
-        ).filter(
-            and_(
-                PlanMenuItem.plan_id == subscription_plan.id,
-                PlanMenuItem.is_included == True,
-                MenuItem.is_active == True
-            )
-        ).options(
-            selectinload(MenuItem.module)
-        ).order_by(MenuItem.sort_order).all()
-        
-        # Get modules that have available menu items
-        module_ids = list(set([item.module_id for item in available_menu_items]))
-        modules = self.db.query(Module).filter(
-            and_(
-                Module.id.in_(module_ids),
-                Module.is_active == True
-            )
-        ).order_by(Module.sort_order).all()
-        
-        return AvailableMenusResponse(
-            modules=[ModuleSchema.model_validate(m) for m in modules],
-            menu_items=[MenuItemWithModule.model_validate(item) for item in available_menu_items],
+
+        self._plan_by_tenant[tenant_id] = subscription_plan
+        return subscription_plan
+
+    def get_available_menus_for_tenant(self, tenant_id: UUID) -> AvailableMenusResponse:
+        """Get available menus based on tenant's subscription plan"""
+
+        if tenant_id in self._menus_by_tenant:
+            return self._menus_by_tenant[tenant_id]
+
+        subscription_plan = self._resolve_subscription_plan(tenant_id)
+
+        # Menus depend only on the plan, so tenants sharing a plan share the result
+        cache_key = hashkey("plan_menus", subscription_plan.id, _catalog_epoch())
+        with _catalog_lock:
+            cached_menus = _plan_menus_cache.get(cache_key)
+        if cached_menus is not None:
+            self._menus_by_tenant[tenant_id] = cached_menus
+            return cached_menus
+
+        module_schemas: Dict[UUID, ModuleSchema] = {}
+        menu_items: List[MenuItemWithModule] = []
+        for module_row, item in self._fetch_available_menu_rows(subscription_plan.id):
+            module = module_schemas.get(module_row.id)
+            if module is None:
+                module = module_schemas[module_row.id] = _module_schema(module_row)
+            menu_items.append(_menu_item_schema(item, module))
+
+        # Only modules that are active and have available menu items
+        modules = sorted(
+            (m for m in module_schemas.values() if m.is_active),
+            key=lambda m: m.sort_order,
+        )
+
+        available_menus = AvailableMenusResponse.model_construct(
+            modules=modules,
+            menu_items=menu_items,
             current_plan=subscription_plan.code,
             plan_name=subscription_plan.name
         )
+        with _catalog_lock:
+            _plan_menus_cache[cache_key] = available_menus
+        self._menus_by_tenant[tenant_id] = available_menus
+        return available_menus
 
     def get_navigation_for_user(self, tenant_id: UUID, allowed_permissions: set[str]) -> List[NavigationModule]:
         """Build navigation tree filtered by the user's permissions"""
 
-        available = self.get_available_menus_for_tenant(tenant_id)
-
-        allowed_items = [
-            item for item in available.menu_items if item.permission_key in allowed_permissions
-        ]
+        if not allowed_permissions:
+            return []
 
-        items_by_module: Dict[UUID, List[MenuItemWithModule]] = {}
-        for item in allowed_items:
-            items_by_module.setdefault(item.module_id, []).append(item)
+        subscription_plan = self._resolve_subscription_plan(tenant_id)
 
         navigation: List[NavigationModule] = []
-        for module in sorted(available.modules, key=lambda m: m.sort_order):
-            module_items = items_by_module.get(module.id)
-            if not module_items:
+        for module_fields, module_keys, item_fields in self._get_plan_navigation(subscription_plan.id):
+            # Prune whole modules the user cannot see before touching their items
+            if module_keys.isdisjoint(allowed_permissions):
                 continue
 
-            sorted_items = sorted(module_items, key=lambda i: i.sort_order)
-            navigation.append(
-                NavigationModule(
-                    id=module.id,
-                    code=module.code,
-                    name=module.name,
-                    icon=module.icon,
-                    sort_order=module.sort_order,
-                    items=[
-                        NavigationMenuItem(
-                            id=item.id,
-                            code=item.code,
-                            name=item.name,
-                            route=item.route,
-                            icon=item.icon,
-                            permission_key=item.permission_key,
-                            sort_order=item.sort_order,
-                        )
-                        for item in sorted_items
-                        if item.route  # only include navigable entries
-                    ],
-                )
-            )
+            items = [
+                NavigationMenuItem.model_construct(**fields)
+                for fields in item_fields
+                if fields["permission_key"] in allowed_permissions
+            ]
+            navigation.append(NavigationModule.model_construct(**module_fields, items=items))
 
-        # remove modules that lost all routable items after filtering
-        navigation = [module for module in navigation if module.items]
         return navigation
 
     # ------------------------------------------------------------------
     # Internal helpers
 
+    def _fetch_available_menu_rows(
+        self, plan_id: UUID, by_module: bool = False
+    ) -> List[Tuple[Module, MenuItem]]:
+        """(module, menu item) rows included in a plan, ordered by menu item
+
+        With ``by_module`` rows are ordered by module first, ready for grouping.
+        """
+
+        ordering = (Module.sort_order, MenuItem.sort_order) if by_module else (MenuItem.sort_order,)
+
+        return self.db.query(Module, MenuItem).join(
+            MenuItem, MenuItem.module_id == Module.id
+        ).join(
+            PlanMenuItem, MenuItem.id == PlanMenuItem.menu_item_id
+        ).filter(
+            and_(
+                PlanMenuItem.plan_id == plan_id,
+                PlanMenuItem.is_included == True,
+                MenuItem.is_active == True
+            )
+        ).order_by(*ordering).all()
+
+    def _get_plan_navigation(
+        self, plan_id: UUID
+    ) -> List[Tuple[Dict[str, Any], frozenset[str], List[Dict[str, Any]]]]:
+        """Routable menu items of a plan grouped under their active modules, in display order
+
+        Each entry also carries the permission keys of the module's items.
+        """
+
+        cache_key = hashkey("plan_navigation", plan_id, _catalog_epoch())
+        with _catalog_lock:
+            cached_navigation = _plan_menus_cache.get(cache_key)
+        if cached_navigation is not None:
+            return cached_navigation
+
+        grouped: Dict[UUID, Tuple[Dict[str, Any], List[Dict[str, Any]]]] = {}
+        for module, item in self._fetch_available_menu_rows(plan_id, by_module=True):
+            if not module.is_active or not item.route:
+                continue
+            if module.id not in grouped:
+                grouped[module.id] = (
+                    {
+                        "id": module.id,
+                        "code": module.code,
+                        "name": module.name,
+                        "icon": module.icon,
+                        "sort_order": module.sort_order,
+                    },
+                    [],
+                )
+            grouped[module.id][1].append(
+                {
+                    "id": item.id,
+                    "code": item.code,
+                    "name": item.name,
+                    "route": item.route,
+                    "icon": item.icon,
+                    "permission_key": item.permission_key,
+                    "sort_order": item.sort_order,
+                }
+            )
+
+        plan_navigation = [
+            (module_fields, frozenset(item["permission_key"] for item in item_fields), item_fields)
+            for module_fields, item_fields in grouped.values()
+        ]
+        with _catalog_lock:
+            _plan_menus_cache[cache_key] = plan_navigation
+        return plan_navigation
+
+    def _get_available_permission_keys(self, tenant_id: UUID) -> Dict[UUID, str]:
+        """Map menu item id -> permission key for the items in the tenant's plan"""
+
+        # Derived from the (cached) plan menus so role writes need no extra query
+        available_menus = self.get_available_menus_for_tenant(tenant_id)
+        return {item.id: item.permission_key for item in available_menus.menu_items}
+
+    def _collect_permission_tokens(
+        self, permission_map: Dict[UUID, str], permissions: List[Dict[str, Any]]
+    ) -> set[str]:
+        """Translate role payload rows into permission tokens, rejecting items outside the plan"""
+
+        permission_tokens: set[str] = set()
+        for perm_data in permissions:
+            menu_item_id = perm_data["menu_item_id"]
+            if not isinstance(menu_item_id, UUID):
+                menu_item_id = UUID(menu_item_id)
+
+            permission_key = permission_map.get(menu_item_id)
+            if permission_key is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Menu item not available for your subscription plan",
+                )
+
+            action_tokens = self._derive_action_tokens(permission_key)
+            permission_tokens.update(
+                token for flag, token in action_tokens.items() if perm_data.get(flag)
+            )
+
+        return permission_tokens
+
     @staticmethod
-    @staticmethod
-    def _replace_action(view_key: str, action: str) -> str:
-        if action == 'view':
-            return view_key
-        if view_key.endswith('.view'):
-            return f"{view_key.rsplit('.', 1)[0]}.{action}"
-        return f"{view_key}.{action}"
+    @lru_cache(maxsize=1024)
+    def _derive_action_tokens(view_key: str) -> Dict[str, str]:
+        """Permission flag -> token for a menu item's view key, e.g. products.view -> products.create"""
+        base = view_key.removesuffix('.view')
+        return {
+            "can_view": view_key,
+            "can_create": f"{base}.create",
+            "can_edit": f"{base}.edit",
+            "can_delete": f"{base}.delete",
+            "can_export": f"{base}.export",
+        }
 
     @staticmethod
-    def _parse_permission_tokens(tokens: Optional[List[str]]) -> Dict[str, Dict[str, bool]]:
-        mapping: Dict[str, Dict[str, bool]] = {}
+    def _parse_permission_tokens(tokens: Optional[List[str]]) -> Dict[str, int]:
+        """Map each base permission key to the PERM_* bits granted by the tokens"""
+        mapping: Dict[str, int] = {}
         if not tokens:
             return mapping
 
-        actions = {'view', 'create', 'edit', 'update', 'delete', 'export'}
-
         for token in tokens:
             if not token:
                 continue
 
-            parts = token.split('.')
-            if not parts:
-                continue
-
-            action = parts[-1].lower()
-            if action in actions:
-                base_parts = parts[:-1]
-                if action != 'view':
-                    base_parts = base_parts + ['view']
-                base_key = '.'.join(base_parts) if base_parts else token
-            else:
-                action = 'view'
+            base, sep, last = token.rpartition('.')
+            bits = _ACTION_BITS.get(last.lower())
+            if bits is None:
+                # Bare keys without a trailing action grant view access
+                bits = PERM_VIEW
                 base_key = token
+            elif bits == PERM_VIEW:
+                base_key = base if sep else token
+            else:
+                base_key = f"{base}.view" if sep else "view"
 
             base_key = base_key.strip()
             if not base_key:
                 continue
 
-            flags = mapping.setdefault(
-                base_key,
-                {
-                    "can_view": False,
-                    "can_create": False,
-                    "can_edit": False,
-                    "can_delete": False,
-                    "can_export": False,
-                },
-            )
-
-            if action in ("view", "read", "can_view", ""):
-                flags["can_view"] = True
-            elif action in ("create", "can_create"):
-                flags["can_create"] = True
-                flags["can_view"] = True
-            elif action in ("edit", "update", "can_edit"):
-                flags["can_edit"] = True
-                flags["can_view"] = True
-            elif action in ("delete", "remove", "can_delete"):
-                flags["can_delete"] = True
-                flags["can_view"] = True
-            elif action in ("export", "can_export"):
-                flags["can_export"] = True
-                flags["can_view"] = True
+            mapping[base_key] = mapping.get(base_key, 0) | bits
         return mapping
 
-    def _build_role_permission_payload(self, role: Role) -> List[Dict[str, Any]]:
-        permission_flags = self._parse_permission_tokens(role.permissions)
-        if not permission_flags:
-            return []
+    def _load_menu_items_by_key(self, permission_keys: set[str]) -> Dict[str, MenuItem]:
+        if not permission_keys:
+            return {}
 
-        menu_items = self.db.query(MenuItem).filter(
-            MenuItem.permission_key.in_(permission_flags.keys())
+        # Role payloads only read menu item columns; fail loudly if that changes
+        menu_items = self.db.query(MenuItem).options(
+            raiseload('*', sql_only=True)
+        ).filter(
+            MenuItem.permission_key.in_(permission_keys)
         ).all()
-        menu_map = {item.permission_key: item for item in menu_items}
+        return {item.permission_key: item for item in menu_items}
 
+    @staticmethod
+    def _build_role_permission_payload(
+        role: Role,
+        permission_flags: Dict[str, int],
+        menu_map: Dict[str, MenuItem],
+    ) -> List[Dict[str, Any]]:
         role_permissions: List[Dict[str, Any]] = []
-        for permission_key, flags in permission_flags.items():
+        for permission_key, bits in permission_flags.items():
             menu_item = menu_map.get(permission_key)
             if not menu_item:
                 continue
 
             role_permissions.append(
                 {
-                    "id": str(role.id),
+                    "id": role.id,
                     "role_id": role.id,
                     "menu_item_id": menu_item.id,
-                    "can_view": flags["can_view"],
-                    "can_create": flags["can_create"],
-                    "can_edit": flags["can_edit"],
-                    "can_delete": flags["can_delete"],
-                    "can_export": flags["can_export"],
+                    **_permission_flags(bits),
                     "created_at": role.created_at,
                     "updated_at": role.updated_at,
                     "menu_item": menu_item,
@@ -241,54 +443,94 @@ class PermissionService:
 
         return role_permissions
 
+    @staticmethod
+    def _to_role_with_permissions(role: Role, role_permissions: List[Dict[str, Any]]) -> RoleWithPermissions:
+        role_data = {
+            "id": role.id,
+            "tenant_id": role.tenant_id,
+            "name": role.name,
+            "description": role.description,
+            "is_system_role": role.is_system_role,
+            "created_at": role.created_at,
+            "updated_at": role.updated_at,
+            "permissions": role_permissions,
+        }
+        return RoleWithPermissions.model_validate(role_data)
+
+    def _get_role_unvalidated(self, role: Role) -> RoleWithPermissions:
+        """Build the response for a role the service has just written, skipping validation"""
+
+        permission_flags = self._parse_permission_tokens(role.permissions)
+        menu_map = self._load_menu_items_by_key(set(permission_flags))
+
+        permissions = [
+            RolePermissionWithMenuItem.model_construct(
+                **{**payload, "menu_item": _plain_menu_item_schema(payload["menu_item"])}
+            )
+            for payload in self._build_role_permission_payload(role, permission_flags, menu_map)
+        ]
+        return RoleWithPermissions.model_construct(
+            id=role.id,
+            tenant_id=role.tenant_id,
+            name=role.name,
+            description=role.description,
+            is_system_role=role.is_system_role,
+            created_at=role.created_at,
+            updated_at=role.updated_at,
+            permissions=permissions,
+        )
+
     def get_roles_for_tenant(self, tenant_id: UUID) -> List[RoleWithPermissions]:
         """Get all roles for a tenant with their permissions"""
 
-        roles = self.db.query(Role).filter(Role.tenant_id == tenant_id).order_by(Role.name).all()
-
-        result = []
-        for role in roles:
-            role_permissions = self._build_role_permission_payload(role)
-            role_data = {
-                "id": role.id,
-                "tenant_id": role.tenant_id,
-                "name": role.name,
-                "description": role.description,
-                "is_system_role": role.is_system_role,
-                "created_at": role.created_at,
-                "updated_at": role.updated_at,
-                "permissions": role_permissions,
+        stmt = select(Role).options(
+            raiseload('*', sql_only=True)
+        ).filter(Role.tenant_id == tenant_id).order_by(Role.name)
+
+        # Stream roles in batches so only one batch of ORM rows is alive at a
+        # time; menu items are resolved once per batch and reused across batches
+        menu_map: Dict[str, MenuItem] = {}
+        result: List[RoleWithPermissions] = []
+        batches = self.db.execute(
+            stmt.execution_options(yield_per=ROLE_BATCH_SIZE)
+        ).scalars().partitions()
+        for roles in batches:
+            flags_by_role = {role.id: self._parse_permission_tokens(role.permissions) for role in roles}
+            missing_keys = {
+                permission_key
+                for flags in flags_by_role.values()
+                for permission_key in flags
+                if permission_key not in menu_map
             }
+            menu_map.update(self._load_menu_items_by_key(missing_keys))
 
-            result.append(RoleWithPermissions.model_validate(role_data))
+            result.extend(
+                self._to_role_with_permissions(
+                    role, self._build_role_permission_payload(role, flags_by_role[role.id], menu_map)
+                )
+                for role in roles
+            )
 
         return result
 
     def get_role_by_id(self, role_id: UUID, tenant_id: UUID) -> Optional[RoleWithPermissions]:
         """Get a specific role with permissions"""
 
-        role = self.db.query(Role).filter(
+        role = self.db.query(Role).options(
+            raiseload('*', sql_only=True)
+        ).filter(
             and_(Role.id == role_id, Role.tenant_id == tenant_id)
         ).first()
 
         if not role:
             return None
 
-        role_permissions = self._build_role_permission_payload(role)
-
-        # Create RoleWithPermissions object
-        role_data = {
-            "id": role.id,
-            "tenant_id": role.tenant_id,
-            "name": role.name,
-            "description": role.description,
-            "is_system_role": role.is_system_role,
-            "created_at": role.created_at,
-            "updated_at": role.updated_at,
-            "permissions": role_permissions
-        }
+        permission_flags = self._parse_permission_tokens(role.permissions)
+        menu_map = self._load_menu_items_by_key(set(permission_flags))
 
-        return RoleWithPermissions.model_validate(role_data)
+        return self._to_role_with_permissions(
+            role, self._build_role_permission_payload(role, permission_flags, menu_map)
+        )
 
     def create_role(self, tenant_id: UUID, role_data: RoleCreate, created_by: UUID) -> RoleWithPermissions:
         """Create a new role with permissions"""
@@ -304,51 +546,23 @@ class PermissionService:
                 detail=f"Role '{role_data.name}' already exists"
             )
         
-        available_menus = self.get_available_menus_for_tenant(tenant_id)
-        available_menu_ids = [item.id for item in available_menus.menu_items]
-        permission_map = {UUID(str(item.id)): item.permission_key for item in available_menus.menu_items}
-
-        permission_tokens: set[str] = set()
+        permission_tokens = self._collect_permission_tokens(
+            self._get_available_permission_keys(tenant_id), role_data.permissions
+        )
 
+        # Insert the role with its final permission set in a single statement
         role = Role(
             id=uuid4(),
             tenant_id=tenant_id,
             name=role_data.name,
             description=role_data.description,
-            permissions=[],
+            permissions=list(permission_tokens),
             is_system_role=False,
         )
         self.db.add(role)
-        self.db.flush()
-
-        for perm_data in role_data.permissions:
-            menu_item_id = UUID(perm_data["menu_item_id"])
-
-            if menu_item_id not in available_menu_ids:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Menu item not available for your subscription plan",
-                )
-
-            permission_key = permission_map.get(menu_item_id)
-            if not permission_key:
-                continue
-
-            if perm_data.get("can_view"):
-                permission_tokens.add(permission_key)
-            if perm_data.get("can_create"):
-                permission_tokens.add(self._replace_action(permission_key, 'create'))
-            if perm_data.get("can_edit"):
-                permission_tokens.add(self._replace_action(permission_key, 'edit'))
-            if perm_data.get("can_delete"):
-                permission_tokens.add(self._replace_action(permission_key, 'delete'))
-            if perm_data.get("can_export"):
-                permission_tokens.add(self._replace_action(permission_key, 'export'))
-
-        role.permissions = list(permission_tokens)
         self.db.commit()
 
-        return self.get_role_by_id(role.id, tenant_id)
+        return self._get_role_unvalidated(role)
 
     def update_role(self, role_id: UUID, tenant_id: UUID, role_data: RoleUpdate, updated_by: UUID) -> RoleWithPermissions:
         """Update role and permissions"""
@@ -393,43 +607,19 @@ class PermissionService:
         
         # Update permissions if provided
         if role_data.permissions is not None:
-            available_menus = self.get_available_menus_for_tenant(tenant_id)
-            available_menu_ids = {UUID(str(item.id)) for item in available_menus.menu_items}
-            permission_map = {UUID(str(item.id)): item.permission_key for item in available_menus.menu_items}
-            permission_tokens: list[str] = []
-
-            for perm_data in role_data.permissions:
-                menu_item_id = UUID(perm_data["menu_item_id"])
-
-                if menu_item_id not in available_menu_ids:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Menu item not available for your subscription plan",
-                    )
-
-                permission_key = permission_map.get(menu_item_id)
-                if not permission_key:
-                    continue
-
-                if perm_data.get("can_view"):
-                    permission_tokens.append(permission_key)
-                if perm_data.get("can_create"):
-                    permission_tokens.append(self._replace_action(permission_key, 'create'))
-                if perm_data.get("can_edit"):
-                    permission_tokens.append(self._replace_action(permission_key, 'edit'))
-                if perm_data.get("can_delete"):
-                    permission_tokens.append(self._replace_action(permission_key, 'delete'))
-                if perm_data.get("can_export"):
-                    permission_tokens.append(self._replace_action(permission_key, 'export'))
-
-            role.permissions = permission_tokens
+            permission_tokens = self._collect_permission_tokens(
+                self._get_available_permission_keys(tenant_id), role_data.permissions
+            )
+
+            role.permissions = list(permission_tokens)
         else:
             # If permissions are omitted in the payload, keep existing ones intact
             role.permissions = role.permissions or []
 
         self.db.commit()
+        get_permission_cache().invalidate_tenant(tenant_id)
 
-        return self.get_role_by_id(role_id, tenant_id)
+        return self._get_role_unvalidated(role)
 
     def delete_role(self, role_id: UUID, tenant_id: UUID, deleted_by: UUID) -> bool:
         """Delete a role"""
@@ -450,22 +640,29 @@ class PermissionService:
                 detail="Cannot delete system roles"
             )
         
-        # Check if role is assigned to any users
-        users_with_role = self.db.query(UserTenant).filter(
-            UserTenant.roles.contains([role.name])
-        ).count()
+        # Check if role is assigned to any users; stop at the first match
+        role_in_use = self.db.query(
+            self.db.query(UserTenant).filter(
+                and_(
+                    UserTenant.tenant_id == tenant_id,
+                    cast(UserTenant.roles, JSONB).contains([role.name])
+                )
+            ).exists()
+        ).scalar()
         
-        if users_with_role > 0:
+        if role_in_use:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Cannot delete role. It is assigned to {users_with_role} user(s)"
+                detail="Cannot delete role. It is assigned to one or more users"
             )
         
         self.db.delete(role)
         self.db.commit()
+        get_permission_cache().invalidate_tenant(tenant_id)
         
         return True
 
+    @cached(_plan_cache, key=lambda self: hashkey("subscription_plans", _catalog_epoch()), lock=_catalog_lock)
     def get_subscription_plans(self) -> List[SubscriptionPlanSchema]:
         """Get all active subscription plans"""
         plans = self.db.query(SubscriptionPlan).filter(
@@ -483,6 +680,11 @@ class PermissionService:
 
         if not user_tenant or not user_tenant.roles:
             return {}
+
+        permission_cache = get_permission_cache()
+        cached_permissions = permission_cache.get_user_permissions(user_id, tenant_id, user_tenant.roles)
+        if cached_permissions is not None:
+            return cached_permissions
         
         roles = self.db.query(Role).filter(
             and_(
@@ -490,32 +692,21 @@ class PermissionService:
                 Role.name.in_(user_tenant.roles)
             )
         ).all()
-        
 
-        aggregated: Dict[str, Dict[str, bool]] = {}
-        for role in roles:
-            print("CEK THE ROLES", role.name, role.permissions)
-            # print("CEK THE ROLE PERMISSIONS", role.permissions)
-            decoded = self._parse_permission_tokens(role.permissions)
-            for permission_key, flags in decoded.items():
-                entry = aggregated.setdefault(
-                    permission_key,
-                    {
-                        'can_view': False,
-                        'can_create': False,
-                        'can_edit': False,
-                        'can_delete': False,
-                        'can_export': False,
-                    },
-                )
-                entry['can_view'] = entry['can_view'] or flags['can_view']
-                entry['can_create'] = entry['can_create'] or flags['can_create']
-                entry['can_edit'] = entry['can_edit'] or flags['can_edit']
-                entry['can_delete'] = entry['can_delete'] or flags['can_delete']
-                entry['can_export'] = entry['can_export'] or flags['can_export']
+        # The parser ORs bits per base key, so one pass over every role's
+        # tokens yields the merged permissions directly
+        aggregated_bits = self._parse_permission_tokens(
+            [token for role in roles if role.permissions for token in role.permissions]
+        )
+        aggregated = {
+            permission_key: _permission_flags(bits)
+            for permission_key, bits in aggregated_bits.items()
+        }
 
+        permission_cache.set_user_permissions(user_id, tenant_id, user_tenant.roles, aggregated)
         return aggregated
 
+    @cached(_catalog_cache, key=lambda self: hashkey("modules", _catalog_epoch()), lock=_catalog_lock)
     def get_all_modules(self) -> List[ModuleSchema]:
         """Get all active modules"""
         modules = self.db.query(Module).filter(
@@ -524,6 +715,7 @@ class PermissionService:
         
         return [ModuleSchema.model_validate(module) for module in modules]
 
+    @cached(_catalog_cache, key=lambda self: hashkey("menu_items", _catalog_epoch()), lock=_catalog_lock)
     def get_all_menu_items(self) -> List[MenuItemWithModule]:
         """Get all active menu items with their modules"""
         menu_items = self.db.query(MenuItem).options(
@@ -1,54 +1,123 @@
-from typing import List, Dict, Any, Optional
+from uuid import uuid4
+from typing import Callable, ClassVar, FrozenSet, Iterator, List, Dict, Any, Optional, Sequence, Tuple, Union
 from datetime import datetime, date
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
 
 from app.core.db import session_scope
 
 
+STREAM_CHUNK_SIZE = 1000
+
+# Export queries only read; a read-only transaction lets PostgreSQL skip
+# write bookkeeping. Reset when the connection goes back to the pool.
+READ_ONLY_OPTIONS = {"postgresql_readonly": True}
+
+# Column names plus an iterator of row tuples in that column order
+ExportRows = Tuple[List[str], Iterator[Sequence[Any]]]
+
+Query = Union[str, TextClause]
+
+
 class BaseDataRepository:
-    """Base repository for data export queries"""
+    """Base repository for data export queries
+
+    Subclasses describe their export query as a base SELECT, optional filter
+    clauses and an ORDER BY; the text() statement for each combination of
+    active filters is built once and cached on the class.
+    """
+
+    _TABLE: ClassVar[str] = ""
+    _BASE_QUERY: ClassVar[str] = ""
+    _FILTER_CLAUSES: ClassVar[Tuple[Tuple[str, str], ...]] = ()
+    _ORDER_BY: ClassVar[str] = ""
+    _QUERY_CACHE: ClassVar[Dict[FrozenSet[str], TextClause]]
+    _table_present: ClassVar[bool]
     
     def __init__(self):
         pass
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # One cache per repository; at most 2**len(_FILTER_CLAUSES) statements
+        cls._QUERY_CACHE = {}
+        cls._table_present = False
+
+    @classmethod
+    def _has_table(cls) -> bool:
+        """Whether the export table exists; only a positive answer is cached,
+        so tables created after startup are picked up"""
+        if not cls._table_present:
+            with session_scope() as session:
+                cls._table_present = session.execute(
+                    text("SELECT to_regclass(:table_name)"), {"table_name": cls._TABLE}
+                ).scalar() is not None
+        return cls._table_present
+
+    @classmethod
+    def _statement(cls, filters: FrozenSet[str]) -> TextClause:
+        """Return the cached statement for the given active filter names"""
+        statement = cls._QUERY_CACHE.get(filters)
+        if statement is None:
+            clauses = "".join(
+                f" AND {clause}" for name, clause in cls._FILTER_CLAUSES if name in filters
+            )
+            statement = text(f"{cls._BASE_QUERY}{clauses} ORDER BY {cls._ORDER_BY}")
+            cls._QUERY_CACHE[filters] = statement
+        return statement
     
-    def _execute_query(self, query: str, params: Dict[str, Any] = None) -> List[Dict[str, Any]]:
-        """Execute raw SQL query and return results as list of dictionaries"""
+    def _stream_positional(
+        self, query: Query, params: Dict[str, Any] = None, chunk_size: int = STREAM_CHUNK_SIZE
+    ) -> ExportRows:
+        """Execute raw SQL query on a server-side cursor; returns column names and a row tuple iterator"""
+        rows = self._iter_positional(query, params, chunk_size)
+        # The first item is the column list; pulling it runs the query
+        columns = next(rows)
+        return columns, rows
+
+    def _iter_positional(self, query: Query, params: Optional[Dict[str, Any]], chunk_size: int):
+        statement = text(query) if isinstance(query, str) else query
         with session_scope() as session:
-            result = session.execute(text(query), params or {})
-            columns = result.keys()
-            rows = result.fetchall()
-            
-            return [dict(zip(columns, row)) for row in rows]
+            # Named cursors need a transaction, so AUTOCOMMIT is not an option here
+            connection = session.connection(execution_options=READ_ONLY_OPTIONS)
+            compiled = statement.compile(dialect=connection.dialect)
+            # A named DBAPI cursor streams from the server and yields plain
+            # tuples, skipping SQLAlchemy's Row wrapping on every exported row
+            cursor = connection.connection.cursor(name=f"export_{uuid4().hex}")
+            try:
+                cursor.itersize = chunk_size
+                cursor.execute(compiled.string, compiled.construct_params(params or {}))
+                # Named cursors only describe their columns after the first fetch
+                first_rows = cursor.fetchmany(chunk_size)
+                yield [column[0] for column in cursor.description]
+                yield from first_rows
+                yield from cursor
+            finally:
+                cursor.close()
+
+    def _stream_with_fallback(
+        self,
+        query: Query,
+        params: Dict[str, Any],
+        fallback: Callable[[], List[Dict[str, Any]]],
+    ) -> ExportRows:
+        """Stream query rows, or the fallback rows while the export table does not exist yet"""
+        if self._has_table():
+            # Query errors propagate instead of silently exporting sample data
+            return self._stream_positional(query, params)
+
+        sample = fallback()
+        columns = list(sample[0].keys())
+        return columns, iter([tuple(row[column] for column in columns) for row in sample])
 
 
 class InvoiceDataRepository(BaseDataRepository):
     """Repository for invoice data export"""
     
-    def get_invoices(
-        self,
-        tenant_id: str,
-        from_date: Optional[date] = None,
-        to_date: Optional[date] = None,
-        status: Optional[str] = None,
-        customer_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """
-        Get invoice data for export
-        
-        Args:
-            tenant_id: Tenant identifier
-            from_date: Start date filter
-            to_date: End date filter
-            status: Invoice status filter
-            customer_id: Customer filter
-            
-        Returns:
-            List of invoice dictionaries
-        """
-        
-        # Base query - adjust table names according to your actual schema
-        query = """
+    _TABLE = 'invoices'
+    # Base query - adjust table names according to your actual schema
+    _BASE_QUERY = """
         SELECT 
             i.id as invoice_id,
             i.invoice_number,
@@ -67,40 +136,49 @@ class InvoiceDataRepository(BaseDataRepository):
         LEFT JOIN customers c ON i.customer_id = c.id
         WHERE 1=1
         """
+    _FILTER_CLAUSES = (
+        ('tenant_id', "i.tenant_id = :tenant_id"),
+        ('from_date', "i.invoice_date >= :from_date"),
+        ('to_date', "i.invoice_date <= :to_date"),
+        ('status', "i.status = :status"),
+        ('customer_id', "i.customer_id = :customer_id"),
+    )
+    _ORDER_BY = "i.invoice_date DESC, i.created_at DESC"
+
+    def get_invoices(
+        self,
+        tenant_id: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        status: Optional[str] = None,
+        customer_id: Optional[str] = None
+    ) -> ExportRows:
+        """
+        Get invoice data for export
         
-        params = {}
-        
-        # Add tenant filter if using multi-tenant setup
-        if tenant_id:
-            query += " AND i.tenant_id = :tenant_id"
-            params['tenant_id'] = tenant_id
-        
-        # Add date filters
-        if from_date:
-            query += " AND i.invoice_date >= :from_date"
-            params['from_date'] = from_date
+        Args:
+            tenant_id: Tenant identifier
+            from_date: Start date filter
+            to_date: End date filter
+            status: Invoice status filter
+            customer_id: Customer filter
             
-        if to_date:
-            query += " AND i.invoice_date <= :to_date"
-            params['to_date'] = to_date
-        
-        # Add status filter
-        if status:
-            query += " AND i.status = :status"
-            params['status'] = status
-        
-        # Add customer filter
-        if customer_id:
-            query += " AND i.customer_id = :customer_id"
-            params['customer_id'] = customer_id
-        
-        query += " ORDER BY i.invoice_date DESC, i.created_at DESC"
+        Returns:
+            Column names and an iterator of invoice row tuples, streamed from the database
+        """
+        params = {
+            'tenant_id': tenant_id,
+            'from_date': from_date,
+            'to_date': to_date,
+            'status': status,
+            'customer_id': customer_id,
+        }
+        # Only truthy filters apply, as before; the statement per filter set is cached
+        params = {name: value for name, value in params.items() if value}
+        statement = self._statement(frozenset(params))
         
-        try:
-            return self._execute_query(query, params)
-        except Exception as e:
-            # Return sample data if tables don't exist yet
-            return self._get_sample_invoice_data()
+        # Return sample data if tables don't exist yet
+        return self._stream_with_fallback(statement, params, self._get_sample_invoice_data)
     
     def _get_sample_invoice_data(self) -> List[Dict[str, Any]]:
         """Return sample invoice data for testing"""
@@ -141,17 +219,8 @@ class InvoiceDataRepository(BaseDataRepository):
 class OrderDataRepository(BaseDataRepository):
     """Repository for order data export"""
     
-    def get_orders(
-        self,
-        tenant_id: str,
-        from_date: Optional[date] = None,
-        to_date: Optional[date] = None,
-        status: Optional[str] = None,
-        customer_id: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Get order data for export"""
-        
-        query = """
+    _TABLE = 'orders'
+    _BASE_QUERY = """
         SELECT 
             o.id as order_id,
             o.order_number,
@@ -169,36 +238,37 @@ class OrderDataRepository(BaseDataRepository):
         LEFT JOIN customers c ON o.customer_id = c.id
         WHERE 1=1
         """
+    _FILTER_CLAUSES = (
+        ('tenant_id', "o.tenant_id = :tenant_id"),
+        ('from_date', "o.order_date >= :from_date"),
+        ('to_date', "o.order_date <= :to_date"),
+        ('status', "o.status = :status"),
+        ('customer_id', "o.customer_id = :customer_id"),
+    )
+    _ORDER_BY = "o.order_date DESC, o.created_at DESC"
+
+    def get_orders(
+        self,
+        tenant_id: str,
+        from_date: Optional[date] = None,
+        to_date: Optional[date] = None,
+        status: Optional[str] = None,
+        customer_id: Optional[str] = None
+    ) -> ExportRows:
+        """Get order data for export"""
         
-        params = {}
-        
-        if tenant_id:
-            query += " AND o.tenant_id = :tenant_id"
-            params['tenant_id'] = tenant_id
-        
-        if from_date:
-            query += " AND o.order_date >= :from_date"
-            params['from_date'] = from_date
-            
-        if to_date:
-            query += " AND o.order_date <= :to_date"
-            params['to_date'] = to_date
-        
-        if status:
-            query += " AND o.status = :status"
-            params['status'] = status
-        
-        if customer_id:
-            query += " AND o.customer_id = :customer_id"
-            params['customer_id'] = customer_id
-        
-        query += " ORDER BY o.order_date DESC, o.created_at DESC"
+        params = {
+            'tenant_id': tenant_id,
+            'from_date': from_date,
+            'to_date': to_date,
+            'status': status,
+            'customer_id': customer_id,
+        }
+        params = {name: value for name, value in params.items() if value}
+        statement = self._statement(frozenset(params))
         
-        try:
-            return self._execute_query(query, params)
-        except Exception as e:
-            # Return sample data if tables don't exist yet
-            return self._get_sample_order_data()
+        # Return sample data if tables don't exist yet
+        return self._stream_with_fallback(statement, params, self._get_sample_order_data)
     
     def _get_sample_order_data(self) -> List[Dict[str, Any]]:
         """Return sample order data for testing"""
@@ -237,17 +307,9 @@ class OrderDataRepository(BaseDataRepository):
 class InventoryDataRepository(BaseDataRepository):
     """Repository for inventory/stock data export"""
     
-    def get_inventory(
-        self,
-        tenant_id: str,
-        category_id: Optional[str] = None,
-        low_stock_only: bool = False,
-        location: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
-        """Get inventory data for export"""
-        
-        # Use existing product model structure
-        query = """
+    _TABLE = 'products'
+    # Use existing product model structure
+    _BASE_QUERY = """
         SELECT 
             p.id as product_id,
             p.name as product_name,
@@ -259,34 +321,34 @@ class InventoryDataRepository(BaseDataRepository):
             (p.stock_quantity * p.price) as total_value,
             p.updated_at as last_updated,
             COALESCE(p.brand, '') as brand,
-            COALESCE(p.unit, 'pcs') as unit,
-            CASE 
-                WHEN p.stock_quantity <= p.minimum_stock THEN 'Low Stock'
-                WHEN p.stock_quantity = 0 THEN 'Out of Stock'
-                ELSE 'In Stock'
-            END as stock_status
+            COALESCE(p.unit, 'pcs') as unit
         FROM products p
         LEFT JOIN product_categories pc ON p.category = pc.id
         WHERE p.is_active = true
         """
+    _FILTER_CLAUSES = (
+        ('category_id', "p.category = :category_id"),
+        ('low_stock_only', "p.stock_quantity <= p.minimum_stock"),
+    )
+    _ORDER_BY = "p.name"
+
+    def get_inventory(
+        self,
+        tenant_id: str,
+        category_id: Optional[str] = None,
+        low_stock_only: bool = False,
+        location: Optional[str] = None
+    ) -> ExportRows:
+        """Get inventory data for export"""
         
-        params = {}
-        
-        # Add filters
-        if category_id:
-            query += " AND p.category = :category_id"
-            params['category_id'] = category_id
-        
+        params = {'category_id': category_id} if category_id else {}
+        filters = set(params)
         if low_stock_only:
-            query += " AND p.stock_quantity <= p.minimum_stock"
-        
-        query += " ORDER BY p.name"
+            filters.add('low_stock_only')
+        statement = self._statement(frozenset(filters))
         
-        try:
-            return self._execute_query(query, params)
-        except Exception as e:
-            # Return sample data if tables don't exist yet
-            return self._get_sample_inventory_data()
+        # Return sample data if tables don't exist yet
+        return self._stream_with_fallback(statement, params, self._get_sample_inventory_data)
     
     def _get_sample_inventory_data(self) -> List[Dict[str, Any]]:
         """Return sample inventory data for testing"""
@@ -302,8 +364,7 @@ class InventoryDataRepository(BaseDataRepository):
                 'total_value': 212500000.00,
                 'last_updated': datetime(2025, 9, 8, 15, 30, 0),
                 'brand': 'Dell',
-                'unit': 'pcs',
-                'stock_status': 'In Stock'
+                'unit': 'pcs'
             },
             {
                 'product_id': 'PROD-002',
@@ -316,8 +377,7 @@ class InventoryDataRepository(BaseDataRepository):
                 'total_value': 750000.00,
                 'last_updated': datetime(2025, 9, 7, 12, 15, 0),
                 'brand': 'Logitech',
-                'unit': 'pcs',
-                'stock_status': 'Low Stock'
+                'unit': 'pcs'
             }
         ]
 
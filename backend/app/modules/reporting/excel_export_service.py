@@ -1,16 +1,64 @@
-from typing import Optional
-from datetime import date
-from io import BytesIO
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Type
+from datetime import date, datetime
 
 from .excel_exporter import (
     ExcelExporter, 
     InvoiceExcelExporter, 
     OrderExcelExporter, 
-    InventoryExcelExporter
+    InventoryExcelExporter,
+    SheetRows
 )
 from .data_repository import DataRepositoryFactory
 
 
+@dataclass(frozen=True, slots=True)
+class ExportFilters:
+    """Export filters; each entity's query reads only the ones it accepts"""
+    from_date: Optional[date] = None
+    to_date: Optional[date] = None
+    status: Optional[str] = None
+    customer_id: Optional[str] = None
+    category_id: Optional[str] = None
+    low_stock_only: bool = False
+    location: Optional[str] = None
+
+
+_NO_FILTERS = ExportFilters()
+
+
+class _EntityExport(NamedTuple):
+    name: str
+    exporter: Type[ExcelExporter]
+    query: str
+    filters: Tuple[str, ...]
+
+
+_INVOICES = _EntityExport(
+    'invoices', InvoiceExcelExporter, 'get_invoices',
+    ('from_date', 'to_date', 'status', 'customer_id')
+)
+_ORDERS = _EntityExport(
+    'orders', OrderExcelExporter, 'get_orders',
+    ('from_date', 'to_date', 'status', 'customer_id')
+)
+_INVENTORY = _EntityExport(
+    'inventory', InventoryExcelExporter, 'get_inventory',
+    ('category_id', 'low_stock_only', 'location')
+)
+
+# Accepted entity type aliases, lower-cased
+_ENTITY_EXPORTS: Dict[str, _EntityExport] = {
+    'invoice': _INVOICES,
+    'invoices': _INVOICES,
+    'order': _ORDERS,
+    'orders': _ORDERS,
+    'inventory': _INVENTORY,
+    'stock': _INVENTORY,
+    'products': _INVENTORY,
+}
+
+
 class ExcelExportService:
     """Service for exporting entity data to Excel format"""
     
@@ -21,84 +69,93 @@ class ExcelExportService:
         self,
         entity_type: str,
         tenant_id: str,
-        from_date: Optional[date] = None,
-        to_date: Optional[date] = None,
-        status: Optional[str] = None,
-        customer_id: Optional[str] = None,
-        category_id: Optional[str] = None,
-        low_stock_only: bool = False,
-        location: Optional[str] = None
-    ) -> BytesIO:
+        filters: ExportFilters = _NO_FILTERS
+    ) -> BinaryIO:
         """
         Export entity data to Excel format
         
         Args:
             entity_type: Type of entity to export (invoice, order, inventory)
             tenant_id: Tenant identifier
-            from_date: Start date filter
-            to_date: End date filter
-            status: Status filter
-            customer_id: Customer filter
-            category_id: Category filter (for inventory)
-            low_stock_only: Show only low stock items (for inventory)
-            location: Location filter (for inventory)
+            filters: Filters for the export; those the entity does not support are ignored
             
         Returns:
-            BytesIO: Excel file content
+            BinaryIO: Excel file content, rewound; the caller closes it
         """
         
-        # Get appropriate repository
-        repository = self.repository_factory.get_repository(entity_type)
+        exporter_cls, columns, rows = self._query_entity(entity_type, tenant_id, filters)
+        return exporter_cls().export_rows(
+            columns,
+            rows,
+            sheet_name=exporter_cls.SHEET_NAME,
+            headers=exporter_cls.HEADERS
+        )
+
+    def export_multi_entity(
+        self,
+        entity_types: List[str],
+        tenant_id: str,
+        filters: ExportFilters = _NO_FILTERS
+    ) -> BinaryIO:
+        """
+        Export several entities to one workbook, one sheet per entity
         
-        # Get data based on entity type
-        if entity_type.lower() in ['invoice', 'invoices']:
-            data = repository.get_invoices(
-                tenant_id=tenant_id,
-                from_date=from_date,
-                to_date=to_date,
-                status=status,
-                customer_id=customer_id
-            )
-            exporter = InvoiceExcelExporter()
-            return exporter.export_invoices(data)
-            
-        elif entity_type.lower() in ['order', 'orders']:
-            data = repository.get_orders(
-                tenant_id=tenant_id,
-                from_date=from_date,
-                to_date=to_date,
-                status=status,
-                customer_id=customer_id
-            )
-            exporter = OrderExcelExporter()
-            return exporter.export_orders(data)
-            
-        elif entity_type.lower() in ['inventory', 'stock', 'products']:
-            data = repository.get_inventory(
-                tenant_id=tenant_id,
-                category_id=category_id,
-                low_stock_only=low_stock_only,
-                location=location
-            )
-            exporter = InventoryExcelExporter()
-            return exporter.export_inventory(data)
+        Entities are queried one after another, each as its sheet is written,
+        so every sheet streams its rows the same way a single export does.
+        
+        Args:
+            entity_types: Entity types to export (invoice, order, inventory)
+            tenant_id: Tenant identifier
+            filters: Filters shared by every entity, as for export_entity_to_excel
             
-        else:
+        Returns:
+            BinaryIO: Excel file content, rewound; the caller closes it
+        """
+        # Drop aliases of the same entity so each sheet is queried once
+        entities: Dict[str, str] = {}
+        for entity_type in entity_types:
+            entities.setdefault(self._entity_export(entity_type).name, entity_type)
+        if not entities:
+            raise ValueError("No entity types provided for export")
+
+        return ExcelExporter().export_sheets(
+            self._sheet_rows(entity_type, tenant_id, filters)
+            for entity_type in entities.values()
+        )
+
+    def _sheet_rows(self, entity_type: str, tenant_id: str, filters: ExportFilters) -> SheetRows:
+        # The query only starts when the writer reaches this sheet, and its
+        # rows are streamed straight into it
+        exporter_cls, columns, rows = self._query_entity(entity_type, tenant_id, filters)
+        return exporter_cls.SHEET_NAME, exporter_cls.HEADERS, columns, rows
+
+    @staticmethod
+    def _entity_export(entity_type: str) -> _EntityExport:
+        entry = _ENTITY_EXPORTS.get(entity_type.lower())
+        if entry is None:
             raise ValueError(f"Unsupported entity type: {entity_type}")
+        return entry
+
+    def _query_entity(
+        self, entity_type: str, tenant_id: str, filters: ExportFilters
+    ) -> Tuple[Type[ExcelExporter], List[str], Iterator[Sequence[Any]]]:
+        """Run the entity's export query with the filters it accepts; returns
+        its exporter class, columns and rows"""
+        entry = self._entity_export(entity_type)
+        repository = self.repository_factory.get_repository(entry.name)
+
+        columns, rows = getattr(repository, entry.query)(
+            tenant_id=tenant_id,
+            **{name: getattr(filters, name) for name in entry.filters}
+        )
+        return entry.exporter, columns, rows
     
     def get_export_filename(self, entity_type: str, tenant_id: str) -> str:
         """Generate appropriate filename for export"""
-        from datetime import datetime
-        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # Normalize entity type for filename
-        entity_name = entity_type.lower()
-        if entity_name in ['invoice', 'invoices']:
-            entity_name = 'invoices'
-        elif entity_name in ['order', 'orders']:
-            entity_name = 'orders'
-        elif entity_name in ['inventory', 'stock', 'products']:
-            entity_name = 'inventory'
+        entry = _ENTITY_EXPORTS.get(entity_type.lower())
+        entity_name = entry.name if entry else entity_type.lower()
         
         return f"{entity_name}_{tenant_id}_{timestamp}.xlsx"
\ No newline at end of file
@@ -1,10 +1,38 @@
-from typing import List, Dict, Any, Optional
+from itertools import chain
+from typing import BinaryIO, Callable, Iterable, List, Any, Mapping, Optional, Sequence, Tuple
 from datetime import datetime, date
-from io import BytesIO
+from decimal import Decimal
+from tempfile import SpooledTemporaryFile
 
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
-from openpyxl.utils import get_column_letter
+import xlsxwriter
+
+
+MAX_COLUMN_WIDTH = 50
+
+# Finished workbooks larger than this are spooled to a temporary file
+SPOOL_MAX_SIZE = 10 * 1024 * 1024
+
+# Format properties shared by every workbook; xlsxwriter Format objects
+# belong to a single workbook, so only these specs can be reused
+HEADER_FORMAT = {
+    "bold": True,
+    "font_color": "#FFFFFF",
+    "bg_color": "#366092",
+    "align": "center",
+    "valign": "vcenter",
+    "border": 1,
+}
+ROW_FORMAT = {"border": 1}
+STRIPED_ROW_FORMAT = {"border": 1, "bg_color": "#F2F2F2"}
+
+DATETIME_NUM_FORMAT = "yyyy-mm-dd hh:mm:ss"
+DATE_NUM_FORMAT = "yyyy-mm-dd"
+
+# Writes one cell (row, col, value, row parity) and returns its display width
+CellWriter = Callable[[int, int, Any, int], int]
+
+# (sheet name, headers, columns, positional rows) for one worksheet
+SheetRows = Tuple[str, List[str], List[str], Iterable[Sequence[Any]]]
 
 
 class ExcelExporter:
@@ -13,162 +41,302 @@ class ExcelExporter:
     def __init__(self):
         self.workbook = None
         self.worksheet = None
+        self._header_format = None
+        self._row_formats = None
+        self._datetime_formats = None
+        self._date_formats = None
         
     def export_to_excel(
         self,
-        data: List[Dict[str, Any]],
+        data: Iterable[Mapping[str, Any]],
         sheet_name: str = "Data",
         headers: Optional[List[str]] = None
-    ) -> BytesIO:
+    ) -> BinaryIO:
         """
         Export data to Excel format
         
         Args:
-            data: List of dictionaries containing row data
+            data: Rows as mappings (dicts or row mappings); may be a one-shot iterator
             sheet_name: Name of the Excel sheet
             headers: Optional custom headers. If None, will use dict keys from first row
             
         Returns:
-            BytesIO: Excel file content
+            BinaryIO: Excel file content, rewound; the caller closes it
         """
-        if not data:
+        rows = iter(data)
+        first_row = next(rows, None)
+        if first_row is None:
             raise ValueError("No data provided for export")
-            
-        self.workbook = Workbook()
-        self.worksheet = self.workbook.active
-        self.worksheet.title = sheet_name
-        
+
         # Determine headers
         if headers is None:
-            headers = list(data[0].keys())
+            headers = list(first_row.keys())
+
+        values = (
+            [row.get(header, "") for header in headers]
+            for row in chain([first_row], rows)
+        )
+        return self._write_workbook([(sheet_name, headers, values)])
+
+    def export_rows(
+        self,
+        columns: List[str],
+        rows: Iterable[Sequence[Any]],
+        sheet_name: str = "Data",
+        headers: Optional[List[str]] = None
+    ) -> BinaryIO:
+        """
+        Export positional rows to Excel format
+        
+        Args:
+            columns: Column names matching the positions in each row
+            rows: Row tuples; may be a one-shot iterator
+            sheet_name: Name of the Excel sheet
+            headers: Optional subset/ordering of columns. Unknown headers export as blanks
             
-        self._write_headers(headers)
-        self._write_data(data, headers)
-        self._apply_formatting(headers)
+        Returns:
+            BinaryIO: Excel file content, rewound; the caller closes it
+        """
+        rows = iter(rows)
+        first_row = next(rows, None)
+        if first_row is None:
+            raise ValueError("No data provided for export")
+
+        if headers is None:
+            headers = list(columns)
+
+        values = self._positional_values(columns, chain([first_row], rows), headers)
+        return self._write_workbook([(sheet_name, headers, values)])
+
+    def export_sheets(self, sheets: Iterable[SheetRows]) -> BinaryIO:
+        """
+        Export several positional row sets to one workbook, one sheet each
         
-        # Save to BytesIO
-        output = BytesIO()
-        self.workbook.save(output)
+        Args:
+            sheets: (sheet name, headers, columns, rows) per worksheet, written in order.
+                An empty row set produces a sheet with only the header row
+            
+        Returns:
+            BinaryIO: Excel file content, rewound; the caller closes it
+        """
+        return self._write_workbook(
+            (sheet_name, headers, self._positional_values(columns, rows, headers))
+            for sheet_name, headers, columns, rows in sheets
+        )
+
+    @staticmethod
+    def _positional_values(
+        columns: List[str], rows: Iterable[Sequence[Any]], headers: List[str]
+    ) -> Iterable[List[Any]]:
+        # Resolve header positions once instead of a key lookup per cell
+        positions = {column: index for index, column in enumerate(columns)}
+        indexes = [positions.get(header) for header in headers]
+
+        return (
+            [row[index] if index is not None else "" for index in indexes]
+            for row in rows
+        )
+
+    def _write_workbook(
+        self, sheets: Iterable[Tuple[str, List[str], Iterable[List[Any]]]]
+    ) -> BinaryIO:
+        """Rows are written in xlsxwriter's constant_memory mode, so each row is
+        flushed as soon as it is written and formatting is applied inline.
+        Sheets are written one after another in the order given, and the
+        finished file moves to disk once it outgrows SPOOL_MAX_SIZE."""
+        output = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        try:
+            self._write_sheets(output, sheets)
+        except Exception:
+            output.close()
+            raise
         output.seek(0)
         
         return output
+
+    def _write_sheets(
+        self, output: BinaryIO, sheets: Iterable[Tuple[str, List[str], Iterable[List[Any]]]]
+    ):
+        self.workbook = xlsxwriter.Workbook(
+            output,
+            {
+                "constant_memory": True,
+                "strings_to_formulas": False,
+                "strings_to_urls": False,
+                # Timestamps are written at their wall-clock time, as before
+                "remove_timezone": True,
+            },
+        )
+        self._header_format = self.workbook.add_format(HEADER_FORMAT)
+        # Bordered cells with alternating row fill, as one format per row parity
+        self._row_formats = self._parity_formats({})
+        self._datetime_formats = self._parity_formats({"num_format": DATETIME_NUM_FORMAT})
+        self._date_formats = self._parity_formats({"num_format": DATE_NUM_FORMAT})
+
+        for sheet_name, headers, values in sheets:
+            self.worksheet = self.workbook.add_worksheet(sheet_name)
+
+            widths = self._write_headers(headers)
+            self._write_data(values, widths)
+            self._apply_formatting(widths)
+        
+        self.workbook.close()
     
-    def _write_headers(self, headers: List[str]):
-        """Write header row with formatting"""
-        for col_num, header in enumerate(headers, 1):
-            cell = self.worksheet.cell(row=1, column=col_num)
-            cell.value = header.replace('_', ' ').title()
-            
-            # Header formatting
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-    
-    def _write_data(self, data: List[Dict[str, Any]], headers: List[str]):
-        """Write data rows"""
-        for row_num, row_data in enumerate(data, 2):  # Start from row 2
-            for col_num, header in enumerate(headers, 1):
-                cell = self.worksheet.cell(row=row_num, column=col_num)
-                value = row_data.get(header, "")
-                
-                # Format different data types
-                if isinstance(value, (datetime, date)):
-                    cell.value = value.strftime("%Y-%m-%d %H:%M:%S") if isinstance(value, datetime) else value.strftime("%Y-%m-%d")
-                elif isinstance(value, (int, float)):
-                    cell.value = value
-                else:
-                    cell.value = str(value) if value is not None else ""
+    def _write_headers(self, headers: List[str]) -> List[int]:
+        """Write header row with formatting; returns the initial column widths"""
+        titles = [header.replace('_', ' ').title() for header in headers]
+        self.worksheet.write_row(0, 0, titles, self._header_format)
+        return [len(title) for title in titles]
     
-    def _apply_formatting(self, headers: List[str]):
-        """Apply formatting to the worksheet"""
-        # Auto-adjust column widths
-        for col_num, header in enumerate(headers, 1):
-            column_letter = get_column_letter(col_num)
-            
-            # Calculate max width for column
-            max_length = len(header.replace('_', ' ').title())
-            for row in self.worksheet.iter_rows(min_col=col_num, max_col=col_num):
-                for cell in row:
-                    if cell.value:
-                        max_length = max(max_length, len(str(cell.value)))
-            
-            # Set column width (with some padding)
-            adjusted_width = min(max_length + 2, 50)  # Max width of 50
-            self.worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        # Add borders and alternating row colors
-        from openpyxl.styles import Border, Side
-        
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
+    def _parity_formats(self, properties: dict) -> tuple:
+        return (
+            self.workbook.add_format({**ROW_FORMAT, **properties}),
+            self.workbook.add_format({**STRIPED_ROW_FORMAT, **properties}),
         )
-        
-        # Apply borders to all cells with data
-        max_row = self.worksheet.max_row
-        max_col = len(headers)
-        
-        for row in range(1, max_row + 1):
-            for col in range(1, max_col + 1):
-                cell = self.worksheet.cell(row=row, column=col)
-                cell.border = thin_border
-                
-                # Alternating row colors (except header)
-                if row > 1 and row % 2 == 0:
-                    cell.fill = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
+
+    def _write_data(self, values: Iterable[List[Any]], widths: List[int]):
+        """Write data rows, tracking column widths as rows stream past"""
+        rows = iter(values)
+        first_row = next(rows, None)
+        if first_row is None:
+            return
+
+        # Pick each column's writer once from its first non-empty value
+        # instead of dispatching on the type of every cell
+        blank_formats = self._row_formats
+
+        def write_pending(row_num: int, col_num: int, value: Any, parity: int) -> int:
+            if value is None:
+                self.worksheet.write_blank(row_num, col_num, None, blank_formats[parity])
+                return 0
+            writers[col_num] = self._column_writer(value)
+            return writers[col_num](row_num, col_num, value, parity)
+
+        writers: List[CellWriter] = [write_pending] * len(first_row)
+
+        for row_num, row_values in enumerate(chain([first_row], rows), 1):  # Row 0 is the header
+            parity = row_num % 2
+            for col_num, value in enumerate(row_values):
+                length = writers[col_num](row_num, col_num, value, parity)
+                if length > widths[col_num]:
+                    widths[col_num] = length
+
+    def _column_writer(self, sample: Any) -> CellWriter:
+        """Return the cell writer for a column whose first value is `sample`"""
+        worksheet = self.worksheet
+        row_formats = self._row_formats
+
+        def write_text(row_num: int, col_num: int, value: Any, parity: int) -> int:
+            text = str(value) if value is not None else ""
+            if not text:
+                worksheet.write_blank(row_num, col_num, None, row_formats[parity])
+                return 0
+            worksheet.write_string(row_num, col_num, text, row_formats[parity])
+            return len(text)
+
+        if isinstance(sample, (datetime, date)):
+            # Native Excel dates: a number plus a display format, no strftime per cell
+            is_datetime = isinstance(sample, datetime)
+            formats = self._datetime_formats if is_datetime else self._date_formats
+            width = len(DATETIME_NUM_FORMAT if is_datetime else DATE_NUM_FORMAT)
+
+            def write_temporal(row_num: int, col_num: int, value: Any, parity: int) -> int:
+                if value is None:
+                    worksheet.write_blank(row_num, col_num, None, formats[parity])
+                    return 0
+                try:
+                    worksheet.write_datetime(row_num, col_num, value, formats[parity])
+                except TypeError:
+                    return write_text(row_num, col_num, value, parity)
+                return width
+
+            return write_temporal
+
+        if isinstance(sample, (int, float, Decimal)) and not isinstance(sample, bool):
+
+            def write_number(row_num: int, col_num: int, value: Any, parity: int) -> int:
+                if value is None:
+                    worksheet.write_blank(row_num, col_num, None, row_formats[parity])
+                    return 0
+                try:
+                    worksheet.write_number(row_num, col_num, value, row_formats[parity])
+                except (TypeError, ValueError):
+                    return write_text(row_num, col_num, value, parity)
+                return len(str(value))
+
+            return write_number
+
+        if isinstance(sample, bool):
+
+            def write_boolean(row_num: int, col_num: int, value: Any, parity: int) -> int:
+                worksheet.write(row_num, col_num, value, row_formats[parity])
+                return len(str(value)) if value is not None else 0
+
+            return write_boolean
+
+        return write_text
+
+    def _apply_formatting(self, widths: List[int]):
+        """Apply column widths (with some padding)"""
+        for col_num, width in enumerate(widths):
+            self.worksheet.set_column(col_num, col_num, min(width + 2, MAX_COLUMN_WIDTH))
 
 
 class InvoiceExcelExporter(ExcelExporter):
     """Specialized Excel exporter for invoice data"""
     
-    def export_invoices(self, invoices: List[Dict[str, Any]]) -> BytesIO:
+    SHEET_NAME = "Invoices"
+    HEADERS = [
+        'invoice_id', 'invoice_number', 'customer_name', 'invoice_date',
+        'due_date', 'subtotal', 'tax_amount', 'total_amount', 'status',
+        'created_at', 'updated_at'
+    ]
+
+    def export_invoices(self, columns: List[str], rows: Iterable[Sequence[Any]]) -> BinaryIO:
         """Export invoice data with custom formatting"""
-        headers = [
-            'invoice_id', 'invoice_number', 'customer_name', 'invoice_date',
-            'due_date', 'subtotal', 'tax_amount', 'total_amount', 'status',
-            'created_at', 'updated_at'
-        ]
-        
-        return self.export_to_excel(
-            data=invoices,
-            sheet_name="Invoices",
-            headers=headers
+        return self.export_rows(
+            columns=columns,
+            rows=rows,
+            sheet_name=self.SHEET_NAME,
+            headers=self.HEADERS
         )
 
 
 class OrderExcelExporter(ExcelExporter):
     """Specialized Excel exporter for order data"""
     
-    def export_orders(self, orders: List[Dict[str, Any]]) -> BytesIO:
+    SHEET_NAME = "Orders"
+    HEADERS = [
+        'order_id', 'order_number', 'customer_name', 'order_date',
+        'delivery_date', 'total_amount', 'status', 'payment_status',
+        'created_at', 'updated_at'
+    ]
+
+    def export_orders(self, columns: List[str], rows: Iterable[Sequence[Any]]) -> BinaryIO:
         """Export order data with custom formatting"""
-        headers = [
-            'order_id', 'order_number', 'customer_name', 'order_date',
-            'delivery_date', 'total_amount', 'status', 'payment_status',
-            'created_at', 'updated_at'
-        ]
-        
-        return self.export_to_excel(
-            data=orders,
-            sheet_name="Orders",
-            headers=headers
+        return self.export_rows(
+            columns=columns,
+            rows=rows,
+            sheet_name=self.SHEET_NAME,
+            headers=self.HEADERS
         )
 
 
 class InventoryExcelExporter(ExcelExporter):
     """Specialized Excel exporter for inventory/stock data"""
     
-    def export_inventory(self, inventory: List[Dict[str, Any]]) -> BytesIO:
+    SHEET_NAME = "Inventory"
+    HEADERS = [
+        'product_id', 'product_name', 'sku', 'category',
+        'current_stock', 'min_stock_level', 'unit_price',
+        'total_value', 'last_updated'
+    ]
+
+    def export_inventory(self, columns: List[str], rows: Iterable[Sequence[Any]]) -> BinaryIO:
         """Export inventory data with custom formatting"""
-        headers = [
-            'product_id', 'product_name', 'sku', 'category',
-            'current_stock', 'min_stock_level', 'unit_price',
-            'total_value', 'last_updated', 'location'
-        ]
-        
-        return self.export_to_excel(
-            data=inventory,
-            sheet_name="Inventory",
-            headers=headers
+        return self.export_rows(
+            columns=columns,
+            rows=rows,
+            sheet_name=self.SHEET_NAME,
+            headers=self.HEADERS
         )
\ No newline at end of file
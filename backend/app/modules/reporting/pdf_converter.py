@@ -1,70 +1,394 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache, wraps
 from io import BytesIO
-from typing import Dict, Any
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Callable, Dict, Any, List, Optional
+import copy
+import multiprocessing
 import os
 import platform
-from jinja2 import Template
+import re
+import tempfile
+import threading
+from urllib.parse import urlsplit
+
+from cachetools import TTLCache
+from jinja2 import Environment, Template
+
+from app.core.config import settings
+
+
+# Tags WeasyPrint never renders but may still fetch: scripts, and <link>s
+# other than stylesheets that apply to print
+_SCRIPT_RE = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+_LINK_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+_STYLESHEET_REL_RE = re.compile(r"""\brel\s*=\s*["']?[^"'>]*\bstylesheet\b""", re.IGNORECASE)
+_SCREEN_MEDIA_RE = re.compile(r"""\bmedia\s*=\s*["']?\s*screen\b""", re.IGNORECASE)
+
+
+def _keep_link(match: "re.Match[str]") -> str:
+    tag = match.group(0)
+    if _STYLESHEET_REL_RE.search(tag) and not _SCREEN_MEDIA_RE.search(tag):
+        return tag
+    return ""
+
+
+def _strip_unrendered_tags(html_content: str) -> str:
+    """Drop scripts and non-print <link> tags before WeasyPrint sees the HTML"""
+    html_content = _SCRIPT_RE.sub("", html_content)
+    return _LINK_RE.sub(_keep_link, html_content)
+
+
+def _is_blocked(url: str) -> bool:
+    host = (urlsplit(url).hostname or "").lower()
+    return any(
+        host == blocked or host.endswith("." + blocked)
+        for blocked in settings.PDF_BLOCKED_URL_HOSTS
+    )
+
+
+# Remote assets (images, fonts, stylesheets) by URL, kept for
+# PDF_ASSET_CACHE_TTL_SECONDS so a file replaced at the same URL is picked up:
+# (final url, body, content type)
+_asset_cache: TTLCache = TTLCache(
+    maxsize=settings.PDF_ASSET_CACHE_MAX_BYTES,
+    ttl=settings.PDF_ASSET_CACHE_TTL_SECONDS,
+    getsizeof=lambda asset: len(asset[1]) or 1,
+)
+_asset_cache_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _fetcher_class():
+    """URL fetcher that skips blocked hosts and caches remote assets"""
+    from weasyprint.urls import URLFetcher, URLFetcherResponse  # type: ignore
+
+    class AssetFetcher(URLFetcher):
+        def fetch(self, url, headers=None):
+            if _is_blocked(url):
+                return URLFetcherResponse(url, b"", {"Content-Type": "text/plain"})
+            if not url.lower().startswith(("http:", "https:")):
+                return super().fetch(url, headers)
+
+            with _asset_cache_lock:
+                asset = _asset_cache.get(url)
+            if asset is None:
+                response = super().fetch(url, headers)
+                try:
+                    asset = (response.url, response.read(), response.headers.get("Content-Type"))
+                finally:
+                    response.close()
+                with _asset_cache_lock:
+                    try:
+                        _asset_cache[url] = asset
+                    except ValueError:
+                        pass  # Larger than the whole cache
+
+            final_url, body, content_type = asset
+            return URLFetcherResponse(
+                final_url, body, {"Content-Type": content_type} if content_type else None
+            )
+
+    return AssetFetcher
+
+
+def _url_fetcher():
+    # A fetcher keeps per-request state, so each render gets its own
+    return _fetcher_class()()
+
+
+# Same defaults as jinja2.Template(), so templates render exactly as before
+_jinja_env = Environment()
+
+
+# Rendered HTML larger than this is spooled to a temporary file
+HTML_SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+@lru_cache(maxsize=128)
+def _compile_template(template_content: str) -> Template:
+    """Compile template source once; a new template version is a new key.
+
+    Unrendered tags are stripped from the source here, once, rather than
+    from every rendered document.
+    """
+    return _jinja_env.from_string(_strip_unrendered_tags(template_content))
+
+
+@lru_cache(maxsize=32)
+def _parsed_css(css_content: str):
+    """Parse a stylesheet once and reuse it across renders"""
+    from weasyprint import CSS  # type: ignore
+
+    return CSS(string=css_content, url_fetcher=_url_fetcher())
+
+
+def _new_font_config():
+    from weasyprint.text.fonts import FontConfiguration  # type: ignore
+
+    return FontConfiguration()
+
+
+@lru_cache(maxsize=16)
+def _template_font_config(template_content: str, css_content: Optional[str]):
+    """Font configuration reused across renders of one template and stylesheet.
+
+    WeasyPrint registers every @font-face rule it meets in the configuration,
+    so one shared by all templates would let a family declared by one tenant
+    resolve in another's documents, and would grow for the life of the worker.
+    """
+    return _new_font_config()
+
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+# Without a pool, renders run on request threads; cached font configurations
+# are not thread-safe, so those renders take turns (WeasyPrint holds the GIL
+# while laying out anyway)
+_inline_render_lock = threading.Lock()
+
+
+def _get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the shared render pool, started on first use; None when disabled"""
+    global _render_pool
+    if settings.PDF_RENDER_WORKERS <= 0:
+        return None
+    if _render_pool is None:
+        with _render_pool_lock:
+            if _render_pool is None:
+                # Spawned workers stay warm, keeping their template/CSS caches
+                _render_pool = ProcessPoolExecutor(
+                    max_workers=settings.PDF_RENDER_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _render_pool
+
+
+def _discard_render_pool(pool: ProcessPoolExecutor) -> None:
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is pool:
+            _render_pool = None
+    pool.shutdown(wait=False)
+
+
+def _shared_sample_data(build: Callable[[], Dict[str, Any]]) -> Callable[[], Dict[str, Any]]:
+    """Build sample data once; every caller gets its own deep copy to change freely"""
+    cached = lru_cache(maxsize=None)(build)
+
+    @wraps(build)
+    def sample_data() -> Dict[str, Any]:
+        return copy.deepcopy(cached())
+
+    return sample_data
 
 
 class PDFConverter:
     """PDF converter using WeasyPrint for HTML to PDF conversion."""
 
     @staticmethod
-    def html_to_pdf(html_content: str, css_content: str = None) -> bytes:
-        """Convert HTML content to PDF bytes."""
+    def _load_weasyprint():
+        """Import WeasyPrint, raising a RuntimeError with setup hints if it cannot load."""
+        # On macOS with Homebrew, ensure dynamic loader can see Homebrew libs
+        if platform.system() == "Darwin":
+            brew_libs = ["/opt/homebrew/lib", "/usr/local/lib"]
+            current = os.environ.get("DYLD_LIBRARY_PATH", "")
+            parts = [p for p in current.split(":") if p]
+            for path in brew_libs:
+                if path not in parts and os.path.isdir(path):
+                    parts.append(path)
+            if parts:
+                os.environ["DYLD_LIBRARY_PATH"] = ":".join(parts)
+
+        # Import WeasyPrint lazily so the app can start without system deps
         try:
-            # On macOS with Homebrew, ensure dynamic loader can see Homebrew libs
-            if platform.system() == "Darwin":
-                brew_libs = ["/opt/homebrew/lib", "/usr/local/lib"]
-                current = os.environ.get("DYLD_LIBRARY_PATH", "")
-                parts = [p for p in current.split(":") if p]
-                for path in brew_libs:
-                    if path not in parts and os.path.isdir(path):
-                        parts.append(path)
-                if parts:
-                    os.environ["DYLD_LIBRARY_PATH"] = ":".join(parts)
-
-            # Import WeasyPrint lazily so the app can start without system deps
-            try:
-                from weasyprint import HTML, CSS  # type: ignore
-            except Exception as imp_err:
-                raise RuntimeError(
-                    "WeasyPrint is not fully available. Install system libraries: "
-                    "Pango, Cairo, GDK-PixBuf, HarfBuzz, and libffi. "
-                    "See docs/weasyprint-setup.md and ensure Homebrew libs are in DYLD_LIBRARY_PATH on macOS."
-                ) from imp_err
-
-            html = HTML(string=html_content)
-
-            if css_content:
-                css = CSS(string=css_content)
-                pdf_bytes = html.write_pdf(stylesheets=[css])
-            else:
-                pdf_bytes = html.write_pdf()
+            import weasyprint  # type: ignore
+        except Exception as imp_err:
+            raise RuntimeError(
+                "WeasyPrint is not fully available. Install system libraries: "
+                "Pango, Cairo, GDK-PixBuf, HarfBuzz, and libffi. "
+                "See docs/weasyprint-setup.md and ensure Homebrew libs are in DYLD_LIBRARY_PATH on macOS."
+            ) from imp_err
+        return weasyprint
+
+    @staticmethod
+    def html_to_pdf(html_content: str, css_content: str = None, full_fonts: bool = False) -> bytes:
+        """Convert HTML content to PDF bytes.
+
+        full_fonts embeds whole fonts instead of subsetting them: a larger
+        file, but it skips the slowest part of writing small PDFs.
+        """
+        return PDFConverter._write_pdf(
+            css_content, full_fonts, _new_font_config(), string=_strip_unrendered_tags(html_content)
+        )
+
+    @staticmethod
+    def _write_pdf(
+        css_content: Optional[str], full_fonts: bool, font_config: Any, **source: Any
+    ) -> bytes:
+        """Write the PDF for an HTML source given as weasyprint.HTML arguments."""
+        try:
+            weasyprint = PDFConverter._load_weasyprint()
+
+            html = weasyprint.HTML(url_fetcher=_url_fetcher(), **source)
+
+            stylesheets = [_parsed_css(css_content)] if css_content else None
+            pdf_bytes = html.write_pdf(
+                stylesheets=stylesheets, font_config=font_config, full_fonts=full_fonts
+            )
 
             return pdf_bytes
 
         except Exception as e:
             raise RuntimeError(f"Failed to convert HTML to PDF: {e}")
 
+    @staticmethod
+    def html_batch_to_pdf(
+        html_contents: List[str],
+        css_content: str = None,
+        target: BinaryIO = None,
+        font_config: Any = None
+    ) -> Optional[bytes]:
+        """Convert several HTML documents into one PDF, each starting on a new page.
+
+        With a target the PDF is written there and None is returned.
+        """
+        try:
+            weasyprint = PDFConverter._load_weasyprint()
+
+            # One font configuration and stylesheet for the whole batch
+            font_config = font_config or _new_font_config()
+            stylesheets = [_parsed_css(css_content)] if css_content else None
+
+            documents = [
+                weasyprint.HTML(
+                    string=_strip_unrendered_tags(html_content), url_fetcher=_url_fetcher()
+                ).render(stylesheets=stylesheets, font_config=font_config)
+                for html_content in html_contents
+            ]
+            pages = [page for document in documents for page in document.pages]
+            return documents[0].copy(pages).write_pdf(target)
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to convert HTML to PDF: {e}")
+
     @staticmethod
     def render_template_to_pdf(
         template_content: str,
         data: Dict[str, Any],
-        css_content: str = None
+        css_content: str = None,
+        full_fonts: bool = False
     ) -> bytes:
-        """Render Jinja2 template with data and convert to PDF."""
+        """Render Jinja2 template with data and convert to PDF.
+
+        The template is streamed into a spooled UTF-8 file that WeasyPrint
+        parses directly, so the document never exists as one Python string.
+        """
         try:
-            # Render Jinja2 template
-            template = Template(template_content)
-            html_content = template.render(**data)
+            template = _compile_template(template_content)
             
-            # Convert to PDF
-            return PDFConverter.html_to_pdf(html_content, css_content)
+            with SpooledTemporaryFile(max_size=HTML_SPOOL_MAX_SIZE) as html_file:
+                template.stream(**data).dump(html_file, encoding="utf-8")
+                html_file.seek(0)
+                
+                return PDFConverter._write_pdf(
+                    css_content,
+                    full_fonts,
+                    _template_font_config(template_content, css_content),
+                    file_obj=html_file,
+                    encoding="utf-8",
+                )
             
         except Exception as e:
             raise RuntimeError(f"Failed to render template to PDF: {e}")
 
     @staticmethod
+    def render_batch_to_pdf(
+        template_content: str,
+        data_list: List[Dict[str, Any]],
+        css_content: str = None,
+        target: BinaryIO = None
+    ) -> Optional[bytes]:
+        """Render one template per data set and combine them into a single PDF."""
+        try:
+            template = _compile_template(template_content)
+            html_contents = [template.render(**data) for data in data_list]
+
+            return PDFConverter.html_batch_to_pdf(
+                html_contents, css_content, target, _template_font_config(template_content, css_content)
+            )
+
+        except Exception as e:
+            raise RuntimeError(f"Failed to render templates to PDF: {e}")
+
+    @staticmethod
+    def render_batch_to_file(
+        template_content: str,
+        data_list: List[Dict[str, Any]],
+        css_content: str = None
+    ) -> str:
+        """Render a batch into a temporary PDF file; the caller removes it."""
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        try:
+            with os.fdopen(fd, "wb") as output:
+                PDFConverter.render_batch_to_pdf(template_content, data_list, css_content, output)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+    @staticmethod
+    def render_in_pool(
+        template_content: str,
+        data: Dict[str, Any],
+        css_content: str = None,
+        full_fonts: bool = False
+    ) -> bytes:
+        """Render a template to PDF in a worker process.
+
+        WeasyPrint holds the GIL while laying out, so renders on request
+        threads run one at a time; worker processes render in parallel.
+        """
+        return PDFConverter._run_in_pool(
+            PDFConverter.render_template_to_pdf, template_content, data, css_content, full_fonts
+        )
+
+    @staticmethod
+    def render_batch_in_pool(
+        template_content: str,
+        data_list: List[Dict[str, Any]],
+        css_content: str = None
+    ) -> BinaryIO:
+        """Render a batch of documents to one PDF in a worker process.
+
+        The worker writes the PDF to disk rather than sending it back as
+        bytes; the returned file is open for reading and the caller closes it.
+        """
+        path = PDFConverter._run_in_pool(
+            PDFConverter.render_batch_to_file, template_content, data_list, css_content
+        )
+        pdf_file = open(path, "rb")
+        # The open handle keeps the data readable until it is closed
+        os.unlink(path)
+        return pdf_file
+
+    @staticmethod
+    def _run_in_pool(render: Callable[..., bytes], *args: Any) -> bytes:
+        pool = _get_render_pool()
+        if pool is None:
+            with _inline_render_lock:
+                return render(*args)
+        try:
+            return pool.submit(render, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM); start a fresh pool on the next render
+            _discard_render_pool(pool)
+            raise
+
+    @staticmethod
+    @_shared_sample_data
     def get_sample_invoice_data() -> Dict[str, Any]:
         """Get sample invoice data for template preview."""
         return {
@@ -128,6 +452,7 @@ class PDFConverter:
         }
 
     @staticmethod
+    @_shared_sample_data
     def get_sample_receipt_data() -> Dict[str, Any]:
         """Get sample receipt data for template preview."""
         return {
@@ -170,6 +495,7 @@ class PDFConverter:
         }
 
     @staticmethod
+    @_shared_sample_data
     def get_sample_po_data() -> Dict[str, Any]:
         """Get sample purchase order data for template preview."""
         return {
@@ -223,6 +549,7 @@ class PDFConverter:
         }
 
     @staticmethod
+    @_shared_sample_data
     def get_sample_product_report_data() -> Dict[str, Any]:
         """Get sample product report data for template preview."""
         return {
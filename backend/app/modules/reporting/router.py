@@ -1,15 +1,18 @@
+import codecs
+import hashlib
+import logging
 from datetime import date
-from io import BytesIO
-from typing import Optional
+from functools import lru_cache, wraps
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Type
 
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
 
 from app.core.security import SecurityPrincipal, get_current_principal
-from .excel_export_service import ExcelExportService
+from .excel_export_service import ExcelExportService, ExportFilters
 from .schemas import (
+    InvoiceBatchRequest,
     PreviewTemplateRequest,
-    ReportingTemplateDto,
     TemplateHistoryResponse,
     TemplateUploadResponse,
 )
@@ -17,12 +20,23 @@ from .service import ReportingService
 
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
+EXCEL_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PDF_MEDIA_TYPE = "application/pdf"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+TEMPLATE_EXTENSIONS = (".html", ".htm")
+TEMPLATE_SNIFF_SIZE = 512
 
+
+# Services keep no per-request state, so one instance each serves every
+# request; this also keeps the storage client (and its bucket check) warm
+@lru_cache(maxsize=1)
 def get_service() -> ReportingService:
     return ReportingService()
 
 
+@lru_cache(maxsize=1)
 def get_excel_service() -> ExcelExportService:
     return ExcelExportService()
 
@@ -31,46 +45,118 @@ def _tenant_id(principal: SecurityPrincipal) -> str:
     return str(principal.tenant_id)
 
 
+def _map_errors(mapping: Dict[Type[Exception], int], failure_prefix: str = ""):
+    """Turn exceptions raised by an endpoint into HTTP errors.
+
+    The first matching type in `mapping` picks the status code; any other
+    exception becomes a 500 and is logged. HTTPExceptions pass through unchanged.
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        @wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            try:
+                return endpoint(*args, **kwargs)
+            except HTTPException:
+                raise
+            except Exception as exc:
+                for exc_type, status_code in mapping.items():
+                    if isinstance(exc, exc_type):
+                        raise HTTPException(status_code=status_code, detail=str(exc)) from exc
+                logger.exception(f"Reporting endpoint {endpoint.__name__} failed")
+                raise HTTPException(status_code=500, detail=f"{failure_prefix}{exc}") from exc
+
+        return wrapper
+
+    return decorator
+
+
+_export_errors = _map_errors({ValueError: 400}, failure_prefix="Export failed: ")
+_template_errors = _map_errors({ValueError: 404})
+_server_errors = _map_errors({})
+
+
+def _is_text_upload(upload: BinaryIO) -> bool:
+    """True when the upload starts as UTF-8 text rather than binary data"""
+    head = upload.read(TEMPLATE_SNIFF_SIZE)
+    upload.seek(0)
+    if b"\0" in head:
+        return False
+    try:
+        # Not final: the sample may end part-way through a character
+        codecs.getincrementaldecoder("utf-8")().decode(head, final=False)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def _iter_file(content: BinaryIO) -> Iterator[bytes]:
+    """Yield the file in fixed-size chunks and close it once sent"""
+    try:
+        while chunk := content.read(DOWNLOAD_CHUNK_SIZE):
+            yield chunk
+    finally:
+        content.close()
+
+
+def _excel_response(excel_content: BinaryIO, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        _iter_file(excel_content),
+        media_type=EXCEL_MEDIA_TYPE,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+def _pdf_response(pdf_content: bytes, filename: str, etag: Optional[str] = None) -> Response:
+    # The rendered bytes are sent as-is, with a Content-Length, instead of
+    # being wrapped in a BytesIO and streamed back out line by line
+    headers = {"Content-Disposition": f"inline; filename={filename}"}
+    if etag:
+        headers.update(_etag_headers(etag))
+    return Response(content=pdf_content, media_type=PDF_MEDIA_TYPE, headers=headers)
+
+
+def _etag_headers(etag: str) -> Dict[str, str]:
+    # Clients keep the PDF but revalidate each time, so unchanged reports cost
+    # no render. A newly activated template changes the tag at once in the
+    # worker that activated it and within ACTIVE_TEMPLATE_TTL_SECONDS elsewhere
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """A 304 response when the client already holds this ETag, else None"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers=_etag_headers(etag))
+    return None
+
+
+def _pdf_file_response(pdf_file: BinaryIO, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        _iter_file(pdf_file),
+        media_type=PDF_MEDIA_TYPE,
+        headers={"Content-Disposition": f"inline; filename={filename}"},
+    )
+
+
 def _stream_excel_response(
     entity: str,
     tenant_id: str,
     excel_service: ExcelExportService,
-    *,
-    from_date: Optional[date] = None,
-    to_date: Optional[date] = None,
-    status: Optional[str] = None,
-    customer_id: Optional[str] = None,
-    category_id: Optional[str] = None,
-    low_stock_only: bool = False,
-    location: Optional[str] = None,
+    filters: ExportFilters,
 ):
-    try:
-        excel_content = excel_service.export_entity_to_excel(
-            entity_type=entity,
-            tenant_id=tenant_id,
-            from_date=from_date,
-            to_date=to_date,
-            status=status,
-            customer_id=customer_id,
-            category_id=category_id,
-            low_stock_only=low_stock_only,
-            location=location,
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=400, detail=str(exc)) from exc
-    except Exception as exc:  # pragma: no cover - unexpected runtime failure
-        raise HTTPException(status_code=500, detail=f"Export failed: {exc}") from exc
+    excel_content = excel_service.export_entity_to_excel(entity, tenant_id, filters)
 
     filename = excel_service.get_export_filename(entity, tenant_id)
 
-    return StreamingResponse(
-        excel_content,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename={filename}"},
-    )
+    return _excel_response(excel_content, filename)
 
 
 @router.post("/admin/templates/{template_type}/upload", response_model=TemplateUploadResponse)
+@_server_errors
 def upload_template(
     template_type: str,
     file: UploadFile = File(...),
@@ -79,21 +165,20 @@ def upload_template(
 ):
     """Upload a new template version for the authenticated tenant."""
 
-    if not file.filename.endswith(".html"):
+    if not (file.filename or "").lower().endswith(TEMPLATE_EXTENSIONS):
         raise HTTPException(status_code=400, detail="Only HTML files are allowed")
+    if not _is_text_upload(file.file):
+        raise HTTPException(status_code=400, detail="Template must be UTF-8 encoded HTML")
 
     tenant_id = _tenant_id(principal)
 
-    try:
-        file_content = BytesIO(file.file.read())
-        template = service.upload_template(
-            tenant_id=tenant_id,
-            template_type=template_type,
-            file_content=file_content,
-            filename=file.filename,
-        )
-    except Exception as exc:  # pragma: no cover - storage/service errors
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    # Hand over the upload's spooled file as-is; storage copies it in chunks
+    template = service.upload_template(
+        tenant_id=tenant_id,
+        template_type=template_type,
+        file_content=file.file,
+        filename=file.filename,
+    )
 
     return TemplateUploadResponse(
         id=template.id,
@@ -105,6 +190,7 @@ def upload_template(
 
 
 @router.post("/admin/templates/{template_type}/preview")
+@_template_errors
 def preview_template(
     template_type: str,
     request: PreviewTemplateRequest = PreviewTemplateRequest(),
@@ -115,25 +201,17 @@ def preview_template(
 
     tenant_id = _tenant_id(principal)
 
-    try:
-        pdf_content = service.preview_template(
-            tenant_id=tenant_id,
-            template_type=template_type,
-            version=request.version,
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
-
-    return StreamingResponse(
-        BytesIO(pdf_content),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"inline; filename={template_type}_preview.pdf"},
+    pdf_content = service.preview_template(
+        tenant_id=tenant_id,
+        template_type=template_type,
+        version=request.version,
     )
 
+    return _pdf_response(pdf_content, f"{template_type}_preview.pdf")
+
 
 @router.post("/admin/templates/{template_type}/{version}/activate")
+@_template_errors
 def activate_template(
     template_type: str,
     version: int,
@@ -144,23 +222,21 @@ def activate_template(
 
     tenant_id = _tenant_id(principal)
 
-    try:
-        service.activate_template(
-            tenant_id=tenant_id,
-            template_type=template_type,
-            version=version,
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    service.activate_template(
+        tenant_id=tenant_id,
+        template_type=template_type,
+        version=version,
+    )
 
     return {"message": f"Template {template_type} v{version} activated successfully"}
 
 
 @router.get("/admin/templates/{template_type}/history", response_model=TemplateHistoryResponse)
+@_server_errors
 def get_template_history(
     template_type: str,
+    request: Request,
+    response: Response,
     principal: SecurityPrincipal = Depends(get_current_principal),
     service: ReportingService = Depends(get_service),
 ):
@@ -168,17 +244,59 @@ def get_template_history(
 
     tenant_id = _tenant_id(principal)
 
-    try:
-        templates = service.get_template_history(tenant_id=tenant_id, template_type=template_type)
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    templates = service.get_template_history(tenant_id=tenant_id, template_type=template_type)
+
+    # Rows only change through upload, activate and delete, which all show in
+    # these fields; the remaining columns are fixed once a version exists
+    etag = '"{}"'.format(hashlib.blake2b(
+        "\n".join(f"{t.id}:{t.version}:{t.is_active}:{t.file_path}" for t in templates).encode(),
+        digest_size=16,
+    ).hexdigest())
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+    response.headers.update(_etag_headers(etag))
+
+    # One validation call for the whole list instead of one per version
+    return TemplateHistoryResponse.model_validate({"templates": templates}, from_attributes=True)
+
+
+@router.get("/reports/export")
+@_export_errors
+def export_entities_to_excel(
+    entities: List[str] = Query(..., description="Entity types to export, one sheet each"),
+    from_date: Optional[date] = Query(None, description="Start date filter (YYYY-MM-DD)"),
+    to_date: Optional[date] = Query(None, description="End date filter (YYYY-MM-DD)"),
+    status: Optional[str] = Query(None, description="Status filter"),
+    customer_id: Optional[str] = Query(None, description="Customer filter"),
+    category_id: Optional[str] = Query(None, description="Category filter (for inventory)"),
+    low_stock_only: bool = Query(False, description="Show only low stock items (for inventory)"),
+    location: Optional[str] = Query(None, description="Location filter (for inventory)"),
+    principal: SecurityPrincipal = Depends(get_current_principal),
+    excel_service: ExcelExportService = Depends(get_excel_service),
+):
+    """Export several entities to one Excel workbook for the current tenant."""
+
+    tenant_id = _tenant_id(principal)
 
-    return TemplateHistoryResponse(
-        templates=[ReportingTemplateDto.model_validate(t) for t in templates]
+    filters = ExportFilters(
+        from_date=from_date,
+        to_date=to_date,
+        status=status,
+        customer_id=customer_id,
+        category_id=category_id,
+        low_stock_only=low_stock_only,
+        location=location,
     )
+    excel_content = excel_service.export_multi_entity(entities, tenant_id, filters)
+
+    filename = excel_service.get_export_filename("report", tenant_id)
+
+    return _excel_response(excel_content, filename)
 
 
 @router.get("/reports/{entity}/export")
+@_export_errors
 def export_entity_to_excel(
     entity: str,
     from_date: Optional[date] = Query(None, description="Start date filter (YYYY-MM-DD)"),
@@ -199,17 +317,20 @@ def export_entity_to_excel(
         entity,
         tenant_id,
         excel_service,
-        from_date=from_date,
-        to_date=to_date,
-        status=status,
-        customer_id=customer_id,
-        category_id=category_id,
-        low_stock_only=low_stock_only,
-        location=location,
+        ExportFilters(
+            from_date=from_date,
+            to_date=to_date,
+            status=status,
+            customer_id=customer_id,
+            category_id=category_id,
+            low_stock_only=low_stock_only,
+            location=location,
+        ),
     )
 
 
 @router.get("/reports/invoices/export")
+@_export_errors
 def export_invoices(
     from_date: Optional[date] = Query(None, description="Start date filter"),
     to_date: Optional[date] = Query(None, description="End date filter"),
@@ -226,14 +347,17 @@ def export_invoices(
         "invoices",
         tenant_id,
         excel_service,
-        from_date=from_date,
-        to_date=to_date,
-        status=status,
-        customer_id=customer_id,
+        ExportFilters(
+            from_date=from_date,
+            to_date=to_date,
+            status=status,
+            customer_id=customer_id,
+        ),
     )
 
 
 @router.get("/reports/orders/export")
+@_export_errors
 def export_orders(
     from_date: Optional[date] = Query(None, description="Start date filter"),
     to_date: Optional[date] = Query(None, description="End date filter"),
@@ -250,14 +374,17 @@ def export_orders(
         "orders",
         tenant_id,
         excel_service,
-        from_date=from_date,
-        to_date=to_date,
-        status=status,
-        customer_id=customer_id,
+        ExportFilters(
+            from_date=from_date,
+            to_date=to_date,
+            status=status,
+            customer_id=customer_id,
+        ),
     )
 
 
 @router.get("/reports/inventory/export")
+@_export_errors
 def export_inventory(
     category_id: Optional[str] = Query(None, description="Product category filter"),
     low_stock_only: bool = Query(False, description="Show only low stock items"),
@@ -273,14 +400,18 @@ def export_inventory(
         "inventory",
         tenant_id,
         excel_service,
-        category_id=category_id,
-        low_stock_only=low_stock_only,
-        location=location,
+        ExportFilters(
+            category_id=category_id,
+            low_stock_only=low_stock_only,
+            location=location,
+        ),
     )
 
 
 @router.get("/reports/products")
+@_template_errors
 def generate_product_report(
+    request: Request,
     principal: SecurityPrincipal = Depends(get_current_principal),
     service: ReportingService = Depends(get_service),
 ):
@@ -288,26 +419,24 @@ def generate_product_report(
 
     tenant_id = _tenant_id(principal)
 
-    try:
-        sample_data = service._get_sample_data("product")
-        pdf_content = service.generate_pdf(tenant_id=tenant_id, template_type="product", data=sample_data)
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    sample_data = service._get_sample_data("product")
+    etag = service.pdf_etag(tenant_id, "product", sample_data)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
+
+    pdf_content = service.generate_pdf(tenant_id=tenant_id, template_type="product", data=sample_data)
 
     report_date = sample_data["report"].get("date", "report")
 
-    return StreamingResponse(
-        BytesIO(pdf_content),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"inline; filename=product_report_{report_date}.pdf"},
-    )
+    return _pdf_response(pdf_content, f"product_report_{report_date}.pdf", etag)
 
 
 @router.get("/reports/invoice/{invoice_id}")
+@_template_errors
 def generate_invoice_pdf(
     invoice_id: str,
+    request: Request,
     principal: SecurityPrincipal = Depends(get_current_principal),
     service: ReportingService = Depends(get_service),
 ):
@@ -315,24 +444,39 @@ def generate_invoice_pdf(
 
     tenant_id = _tenant_id(principal)
 
-    try:
-        pdf_content = service.generate_invoice_pdf(tenant_id=tenant_id, invoice_id=invoice_id)
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    etag = service.pdf_etag(tenant_id, "invoice", service._sample_invoice_data(invoice_id))
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
 
-    return StreamingResponse(
-        BytesIO(pdf_content),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"inline; filename=invoice_{invoice_id}.pdf"},
-    )
+    pdf_content = service.generate_invoice_pdf(tenant_id=tenant_id, invoice_id=invoice_id)
+
+    return _pdf_response(pdf_content, f"invoice_{invoice_id}.pdf", etag)
+
+
+@router.post("/reports/invoices/batch")
+@_template_errors
+def generate_invoice_batch_pdf(
+    payload: InvoiceBatchRequest,
+    principal: SecurityPrincipal = Depends(get_current_principal),
+    service: ReportingService = Depends(get_service),
+):
+    """Generate one PDF containing several invoices for the current tenant."""
+
+    tenant_id = _tenant_id(principal)
+
+    # Batches can run to many pages, so they are streamed from disk
+    pdf_file = service.generate_invoice_pdfs(tenant_id=tenant_id, invoice_ids=payload.invoice_ids)
+
+    return _pdf_file_response(pdf_file, "invoices_batch.pdf")
 
 
 @router.get("/reports/{template_type}/{entity_id}")
+@_template_errors
 def generate_pdf_report(
     template_type: str,
     entity_id: str,
+    request: Request,
     principal: SecurityPrincipal = Depends(get_current_principal),
     service: ReportingService = Depends(get_service),
 ):
@@ -340,21 +484,17 @@ def generate_pdf_report(
 
     tenant_id = _tenant_id(principal)
 
-    try:
-        sample_data = service._get_sample_data(template_type)
-        pdf_content = service.generate_pdf(
-            tenant_id=tenant_id,
-            template_type=template_type,
-            data=sample_data,
-        )
-    except ValueError as exc:
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
-    except Exception as exc:  # pragma: no cover
-        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    sample_data = service._get_sample_data(template_type)
+    etag = service.pdf_etag(tenant_id, template_type, sample_data)
+    not_modified = _not_modified(request, etag)
+    if not_modified:
+        return not_modified
 
-    return StreamingResponse(
-        BytesIO(pdf_content),
-        media_type="application/pdf",
-        headers={"Content-Disposition": f"inline; filename={template_type}_{entity_id}.pdf"},
+    pdf_content = service.generate_pdf(
+        tenant_id=tenant_id,
+        template_type=template_type,
+        data=sample_data,
     )
 
+    return _pdf_response(pdf_content, f"{template_type}_{entity_id}.pdf", etag)
+
@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 
@@ -33,4 +33,8 @@ class ActivateTemplateRequest(BaseModel):
 
 
 class PreviewTemplateRequest(BaseModel):
-    version: Optional[int] = None
\ No newline at end of file
+    version: Optional[int] = None
+
+
+class InvoiceBatchRequest(BaseModel):
+    invoice_ids: List[str] = Field(..., min_length=1, max_length=100)
@@ -1,14 +1,146 @@
-from typing import BinaryIO, Dict, Any, Optional, List
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, Any, Optional, List, Tuple
 from io import BytesIO
 
+import orjson
+from cachetools import LRUCache, TTLCache
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.db import session_scope
 from app.modules.reporting.models import ReportingTemplate
 from app.modules.reporting.storage import StorageAdapter, get_storage_adapter
 from app.modules.reporting.pdf_converter import PDFConverter
 
 
+# Rendered PDFs by content key (see _pdf_key): in memory up to
+# PDF_CACHE_MAX_BYTES, and on disk under PDF_CACHE_DIR when set, up to
+# PDF_CACHE_DIR_MAX_BYTES (least recently used files go first). Keys cover the
+# template source itself, so changed templates never hit an earlier render and
+# those simply age out of both. Remote assets a template references can change
+# at the same URL, so keys also roll over every PDF_ASSET_CACHE_TTL_SECONDS;
+# a replaced asset shows up within about twice that.
+PDF_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+_pdf_cache: LRUCache = LRUCache(maxsize=PDF_CACHE_MAX_BYTES, getsizeof=len)
+_pdf_cache_lock = threading.Lock()
+
+
+# Active template (file path, source, source digest) per (tenant, template type).
+# Activation clears the entry only in the worker that handled it; every other
+# worker keeps rendering, and tagging, the previous template for up to
+# ACTIVE_TEMPLATE_TTL_SECONDS.
+ACTIVE_TEMPLATE_TTL_SECONDS = 30
+
+_active_templates: TTLCache = TTLCache(maxsize=1024, ttl=ACTIVE_TEMPLATE_TTL_SECONDS)
+_active_templates_lock = threading.Lock()
+
+
+def _template_digest(template_source: bytes) -> bytes:
+    return hashlib.blake2b(template_source, digest_size=16).digest()
+
+
+def _pdf_key(tenant_id: str, template_type: str, template_digest: bytes, variant: bytes) -> str:
+    """Content key of a rendered PDF; variant is the data digest, or a marker"""
+    key = hashlib.blake2b(digest_size=16)
+    asset_period = int(time.time() // max(settings.PDF_ASSET_CACHE_TTL_SECONDS, 1))
+    key.update(orjson.dumps([tenant_id, template_type, asset_period]))
+    key.update(template_digest)
+    key.update(variant)
+    return key.hexdigest()
+
+
+def _cached_pdf(cache_key: str, render: Callable[[], bytes]) -> bytes:
+    with _pdf_cache_lock:
+        pdf_content = _pdf_cache.get(cache_key)
+    if pdf_content is not None:
+        return pdf_content
+    
+    pdf_content = _load_cached_pdf_file(cache_key)
+    if pdf_content is None:
+        pdf_content = render()
+        _save_cached_pdf_file(cache_key, pdf_content)
+    
+    with _pdf_cache_lock:
+        try:
+            _pdf_cache[cache_key] = pdf_content
+        except ValueError:
+            pass  # Larger than the whole cache
+    return pdf_content
+
+
+def _load_cached_pdf_file(cache_key: str) -> Optional[bytes]:
+    if not settings.PDF_CACHE_DIR:
+        return None
+    path = os.path.join(settings.PDF_CACHE_DIR, f"{cache_key}.pdf")
+    try:
+        with open(path, "rb") as cached:
+            pdf_content = cached.read()
+        # Mark the file as recently used for _prune_cached_pdf_files
+        os.utime(path)
+    except OSError:
+        return None
+    return pdf_content
+
+
+def _save_cached_pdf_file(cache_key: str, pdf_content: bytes) -> None:
+    if not settings.PDF_CACHE_DIR:
+        return
+    # Write under a temporary name and rename, so other workers never read
+    # a partial file; the disk cache is best-effort
+    try:
+        os.makedirs(settings.PDF_CACHE_DIR, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=settings.PDF_CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as output:
+                output.write(pdf_content)
+            os.replace(temp_path, os.path.join(settings.PDF_CACHE_DIR, f"{cache_key}.pdf"))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        _prune_cached_pdf_files()
+    except OSError:
+        pass
+
+
+def _prune_cached_pdf_files() -> None:
+    """Remove the least recently used PDFs until the directory fits its bound"""
+    cached_files = []
+    total_size = 0
+    with os.scandir(settings.PDF_CACHE_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".pdf"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue  # Removed by another worker
+            cached_files.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+    
+    if total_size <= settings.PDF_CACHE_DIR_MAX_BYTES:
+        return
+    for _, size, path in sorted(cached_files):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass  # Another worker may be pruning too
+        total_size -= size
+        if total_size <= settings.PDF_CACHE_DIR_MAX_BYTES:
+            break
+
+
+def _data_digest(data: Dict[str, Any]) -> bytes:
+    canonical = orjson.dumps(
+        data, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str
+    )
+    return hashlib.blake2b(canonical, digest_size=16).digest()
+
+
 class ReportingService:
     """Main service class for reporting functionality."""
 
@@ -76,14 +208,20 @@ class ReportingService:
             if not template:
                 raise ValueError(f"Template not found for {template_type}")
             
-            # Load template content
-            template_content = self.storage.load(template.file_path).decode('utf-8')
+            file_path = template.file_path
             
-            # Get sample data based on template type
-            sample_data = self._get_sample_data(template_type)
-            
-            # Render to PDF
-            return self.pdf_converter.render_template_to_pdf(template_content, sample_data)
+        # Load the source once the session has released its connection
+        template_source = self.storage.load(file_path)
+        
+        # Get sample data based on template type
+        sample_data = self._get_sample_data(template_type)
+        
+        # Sample data is fixed, so the same template source always previews the
+        # same; previews are cached like reports, so fonts are subset like reports
+        return _cached_pdf(
+            _pdf_key(tenant_id, template_type, _template_digest(template_source), b"preview"),
+            lambda: self.pdf_converter.render_in_pool(template_source.decode('utf-8'), sample_data),
+        )
 
     def activate_template(
         self,
@@ -112,8 +250,11 @@ class ReportingService:
                 raise ValueError(f"Template version {version} not found for {template_type}")
             
             template.is_active = True
-            
-            return True
+        
+        with _active_templates_lock:
+            _active_templates.pop((tenant_id, template_type), None)
+        
+        return True
 
     def get_template_history(
         self,
@@ -136,24 +277,24 @@ class ReportingService:
     ) -> bytes:
         """Generate PDF using active template with real data."""
         
-        with session_scope() as session:
-            # Get active template
-            template = session.query(ReportingTemplate)\
-                .filter_by(
-                    tenant_id=tenant_id,
-                    template_type=template_type,
-                    is_active=True
-                )\
-                .first()
-            
-            if not template:
-                raise ValueError(f"No active template found for {template_type}")
-            
-            # Load template content
-            template_content = self.storage.load(template.file_path).decode('utf-8')
-            
-            # Render to PDF
-            return self.pdf_converter.render_template_to_pdf(template_content, data)
+        _, template_content, template_digest = self._active_template(tenant_id, template_type)
+        
+        return _cached_pdf(
+            _pdf_key(tenant_id, template_type, template_digest, _data_digest(data)),
+            lambda: self.pdf_converter.render_in_pool(template_content, data),
+        )
+
+    def pdf_etag(self, tenant_id: str, template_type: str, data: Dict[str, Any]) -> str:
+        """Strong ETag for the PDF generate_pdf returns, computed without rendering.
+
+        It follows the same cached active template as generate_pdf, so after an
+        activation other workers may keep returning the old tag (and PDF) for
+        up to ACTIVE_TEMPLATE_TTL_SECONDS.
+        """
+        
+        template_digest = self._active_template(tenant_id, template_type)[2]
+        
+        return f'"{_pdf_key(tenant_id, template_type, template_digest, _data_digest(data))}"'
 
     def generate_invoice_pdf(
         self,
@@ -166,12 +307,64 @@ class ReportingService:
         
         # In real implementation, this would fetch invoice data from database
         # For now, use sample data with the invoice_id
-        sample_data = self.pdf_converter.get_sample_invoice_data()
-        sample_data["invoice"]["id"] = invoice_id
-        sample_data["invoice"]["number"] = invoice_id
+        sample_data = self._sample_invoice_data(invoice_id)
         
         return self.generate_pdf(tenant_id, "invoice", sample_data)
 
+    def generate_invoice_pdfs(self, tenant_id: str, invoice_ids: List[str]) -> BinaryIO:
+        """Generate one PDF holding every requested invoice, in order; the caller closes it."""
+        
+        template_content = self._load_active_template(tenant_id, "invoice")
+        
+        # In real implementation, this would fetch invoice data from database
+        data_list = [self._sample_invoice_data(invoice_id) for invoice_id in invoice_ids]
+        
+        # A single WeasyPrint job for the whole batch
+        return self.pdf_converter.render_batch_in_pool(template_content, data_list)
+
+    def _sample_invoice_data(self, invoice_id: str) -> Dict[str, Any]:
+        """Sample invoice data for one invoice ID, without touching the shared sample."""
+        sample_data = self.pdf_converter.get_sample_invoice_data()
+        return {
+            **sample_data,
+            "invoice": {**sample_data["invoice"], "id": invoice_id, "number": invoice_id},
+        }
+
+    def _load_active_template(self, tenant_id: str, template_type: str) -> str:
+        """Load the source of the tenant's active template."""
+        
+        return self._active_template(tenant_id, template_type)[1]
+
+    def _active_template(self, tenant_id: str, template_type: str) -> Tuple[str, str, bytes]:
+        """File path, source and source digest of the tenant's active template, cached briefly."""
+        
+        key = (tenant_id, template_type)
+        with _active_templates_lock:
+            active = _active_templates.get(key)
+        if active is not None:
+            return active
+        
+        with session_scope() as session:
+            template = session.query(ReportingTemplate)\
+                .filter_by(
+                    tenant_id=tenant_id,
+                    template_type=template_type,
+                    is_active=True
+                )\
+                .first()
+            
+            if not template:
+                raise ValueError(f"No active template found for {template_type}")
+            
+            file_path = template.file_path
+        
+        # Load the source once the session has released its connection
+        template_source = self.storage.load(file_path)
+        active = (file_path, template_source.decode('utf-8'), _template_digest(template_source))
+        with _active_templates_lock:
+            _active_templates[key] = active
+        return active
+
     def _get_sample_data(self, template_type: str) -> Dict[str, Any]:
         """Get sample data based on template type."""
         if template_type == "invoice":
@@ -1,4 +1,5 @@
 import os
+import shutil
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import BinaryIO
@@ -7,6 +8,9 @@ from minio import Minio
 from minio.error import S3Error
 
 
+COPY_CHUNK_SIZE = 64 * 1024
+
+
 class StorageAdapter(ABC):
     """Abstract base class for storage adapters."""
 
@@ -44,7 +48,7 @@ class LocalStorage(StorageAdapter):
         full_path.parent.mkdir(parents=True, exist_ok=True)
         
         with open(full_path, "wb") as f:
-            f.write(file_content.read())
+            shutil.copyfileobj(file_content, f, COPY_CHUNK_SIZE)
         
         return str(full_path.relative_to(self.base_path))
 